@@ -4,6 +4,7 @@ This module provides shared resources (db, cache) that are used across the appli
 The actual application factory is in app.connexion_app.
 """
 import logging
+import os
 from flask_sqlalchemy import SQLAlchemy
 from flask_caching import Cache
 
@@ -12,8 +13,17 @@ from flask_caching import Cache
 db = SQLAlchemy()
 cache = Cache()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure the "app" logger once with a single handler/formatter instead of
+# logging.basicConfig(), leaving the root logger to uvicorn/Celery.
+# propagate=False avoids duplicate lines when Celery installs a root handler.
+# LOG_LEVEL (default INFO) sets its level, e.g. DEBUG to see the routes
+# logged at boot when LOG_ROUTES_ON_BOOT is on.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_app_logger = logging.getLogger(__name__)
+if not _app_logger.handlers:
+    _log_handler = logging.StreamHandler()
+    _log_handler.setFormatter(_log_formatter)
+    _app_logger.addHandler(_log_handler)
+_app_logger.setLevel(LOG_LEVEL)
+_app_logger.propagate = False
@@ -2,8 +2,9 @@
 import logging
 from flask import request
 
+from app.models import ALLOWED_ROLES
 from app.services.auth_service import AuthService
-from app.utils.auth_decorator import require_auth
+from app.utils.auth_decorator import require_auth, invalidate_token
 
 logger = logging.getLogger(__name__)
 
@@ -54,7 +55,7 @@ def register(body: dict = None):
         return {"error": "Password must be at least 6 characters long"}, 400
     
     # Validate role
-    if role not in ["user", "admin"]:
+    if role not in ALLOWED_ROLES:
         return {"error": "Role must be either 'user' or 'admin'"}, 400
     
     return AuthService.register_user(username, email, password, role)
@@ -70,20 +71,16 @@ def logout():
         JSON response with logout status
     """
     user_id = request.current_user.get("user_id")
-    auth_header = request.headers.get("Authorization")
-    
-    # Extract token from header
-    token = None
-    if auth_header:
-        try:
-            _, token = auth_header.split(" ", 1)
-        except ValueError:
-            pass
+    # Already parsed from the Authorization header by @require_auth
+    token = getattr(request, "current_token", None)
     
     if not token:
         return {"error": "Token not found"}, 400
     
-    return AuthService.logout_user(token, user_id)
+    response = AuthService.logout_user(token, user_id)
+    # Stop serving this token's cached claims from this process
+    invalidate_token(token)
+    return response
 
 
 def refresh(body: dict = None):
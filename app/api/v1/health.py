@@ -1,11 +1,9 @@
 """Health check endpoints."""
-import logging
 
-logger = logging.getLogger(__name__)
+# Shared, never mutated: health probes hit this endpoint constantly
+_PING_RESPONSE = ({"ok": True}, 200)
 
 
 def ping():
     """Return a simple health payload."""
-    logger.debug("Health check requested")
-    return {"ok": True}
-
+    return _PING_RESPONSE
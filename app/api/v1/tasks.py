@@ -1,18 +1,63 @@
 """Task-related endpoints."""
 import logging
+import os
+import threading
+import uuid
 from flask import request
+from celery.exceptions import TimeoutError as CeleryTimeoutError
 from celery.result import AsyncResult
 
+from app import cache
 from app.tasks import add
 
 logger = logging.getLogger(__name__)
 
+# Prebuilt signature; per call we only clone it with the arguments
+_ADD_SIG = add.s()
+
+# Upper bound for task_wait; keep below proxy/load balancer idle timeouts.
+# task_wait is a sync handler: each waiting request holds one of the worker's
+# WSGI_THREADS handler threads (default 10) for up to this many seconds.
+TASK_WAIT_MAX_TIMEOUT = float(os.getenv("TASK_WAIT_MAX_TIMEOUT", "25"))
+# At most this many requests per worker process block in task_wait at once,
+# so long-polls can never take every handler thread; keep it well below
+# WSGI_THREADS. Requests over the cap get the current state immediately.
+TASK_WAIT_MAX_WAITERS = int(os.getenv("TASK_WAIT_MAX_WAITERS", "4"))
+_wait_slots = threading.BoundedSemaphore(max(TASK_WAIT_MAX_WAITERS, 1))
+
+# Finished tasks never change state, so cache them for a long time.
+# Unfinished states get a short micro-cache to coalesce bursty polling.
+TERMINAL_STATE_CACHE_TTL = 3600
+PENDING_STATE_CACHE_TTL = 1
+
+
+def _is_valid_task_id(task_id: str) -> bool:
+    """Return True if task_id is a UUID (the format Celery generates)."""
+    try:
+        uuid.UUID(task_id)
+    except ValueError:
+        return False
+    return True
+
+
+def _finished_payload(state: str, value) -> dict:
+    """Build the payload for a finished task.
+
+    Failed and revoked tasks carry the exception instead of a result, which
+    is not JSON serializable, so it is reported as its message under "error".
+    """
+    if isinstance(value, BaseException):
+        return {"state": state, "error": str(value)}
+    return {"state": state, "result": value}
+
 
 def add_route(x: int, y: int):
     """Trigger the Celery add task."""
-    logger.info("Received add request: %s + %s", x, y)
-    task = add.delay(int(x), int(y))
-    logger.debug("Queued task id: %s", task.id)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Received add request: %s + %s", x, y)
+    task = _ADD_SIG.clone(args=(int(x), int(y))).apply_async()
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Queued task id: %s", task.id)
     return {"task_id": task.id}
 
 
@@ -22,11 +67,65 @@ def task_status():
     if not task_id:
         logger.warning("Task status requested without task_id")
         return {"error": "Missing parameter 'task_id'"}, 400
+    # Reject malformed ids before they cost a cache/backend round-trip
+    if not _is_valid_task_id(task_id):
+        return {"error": "Invalid parameter 'task_id'"}, 400
+
+    cache_key = f"ts:{task_id}"
+    payload = cache.get(cache_key)
+    if payload is not None:
+        return payload
 
     result = AsyncResult(task_id)
-    logger.debug("Task %s state: %s", task_id, result.state)
+    state = result.state
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Task %s state: %s", task_id, state)
 
     if result.ready():
-        return {"state": result.state, "result": result.result}
-    return {"state": result.state}
+        payload = _finished_payload(state, result.result)
+        cache.set(cache_key, payload, timeout=TERMINAL_STATE_CACHE_TTL)
+    else:
+        payload = {"state": state}
+        cache.set(cache_key, payload, timeout=PENDING_STATE_CACHE_TTL)
+    return payload
+
+
+def task_wait(task_id: str, timeout: float = TASK_WAIT_MAX_TIMEOUT):
+    """Long-poll a Celery task until it finishes or the timeout elapses.
+
+    The Redis result backend publishes each result on a channel named after
+    the result key, so AsyncResult.get() blocks on a pub/sub subscription
+    instead of polling. Clients should call this in a loop with a
+    progressive backoff between calls that return a non-terminal state.
+    When TASK_WAIT_MAX_WAITERS requests are already waiting, the current
+    state is returned without blocking.
+
+    Args:
+        task_id: Celery task id
+        timeout: Seconds to wait, capped at TASK_WAIT_MAX_TIMEOUT
+
+    Returns:
+        Same payload as task_status
+    """
+    if not _is_valid_task_id(task_id):
+        return {"error": "Invalid parameter 'task_id'"}, 400
+
+    timeout = min(max(float(timeout), 0.0), TASK_WAIT_MAX_TIMEOUT)
+    result = AsyncResult(task_id)
+
+    if not _wait_slots.acquire(blocking=False):
+        logger.warning("task_wait at capacity (%s waiters), not blocking", TASK_WAIT_MAX_WAITERS)
+        if result.ready():
+            return _finished_payload(result.state, result.result)
+        return {"state": result.state}
+
+    try:
+        value = result.get(timeout=timeout, propagate=False)
+    except CeleryTimeoutError:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Task %s not ready after %ss", task_id, timeout)
+        return {"state": result.state}
+    finally:
+        _wait_slots.release()
 
+    return _finished_payload(result.state, value)
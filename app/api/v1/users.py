@@ -1,32 +1,51 @@
 """User endpoints."""
+import hashlib
 import logging
 from time import sleep
 
+from flask import make_response, request
+
 from app import cache
-from app.services.user_service import UserService
+from app.services.user_service import DEFAULT_PAGE_SIZE, UserService
 from app.utils.auth_decorator import require_auth, require_role
+from app.utils.cache_utils import singleflight
 
 logger = logging.getLogger(__name__)
 
 CACHE_TTL_SECONDS = 60
 
 
-@cache.memoize(timeout=CACHE_TTL_SECONDS)
 def _load_user_from_source(user_id: str) -> str:
-    """Simulate a slow data source and cache the payload."""
+    """Simulate a slow data source."""
     logger.info("Fetching user %s from slow backend", user_id)
     sleep(5)
     return f"User {user_id} data"
 
 
 def get_user(user_id: str):
-    """Return cached user data."""
-    payload = _load_user_from_source(user_id)
-    return payload
+    """Return cached user data.
+    
+    Only one request per user_id recomputes the payload when the cache entry
+    expires; concurrent requests wait for its result. The response carries a
+    strong ETag of the payload, so clients revalidating with If-None-Match
+    get an empty 304 instead of the body.
+    """
+    payload = singleflight(
+        cache,
+        f"user:{user_id}",
+        lambda: _load_user_from_source(user_id),
+        timeout=CACHE_TTL_SECONDS,
+    )
+    response = make_response(payload)
+    response.mimetype = "text/plain"
+    response.set_etag(hashlib.blake2b(payload.encode(), digest_size=16).hexdigest())
+    response.cache_control.private = True
+    response.cache_control.max_age = CACHE_TTL_SECONDS
+    return response.make_conditional(request)
 
 
 @require_auth
 @require_role("admin")
-def list_users():
-    """List all users (Admin only)."""
-    return UserService.get_all_users()
+def list_users(limit: int = DEFAULT_PAGE_SIZE, offset: int = 0):
+    """List users page by page (Admin only)."""
+    return UserService.get_all_users(limit=limit, offset=offset)
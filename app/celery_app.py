@@ -7,11 +7,20 @@ import os
 from celery import Celery
 from kombu import Exchange, Queue
 
+from app.redis_pool import REDIS_MAX_CONNECTIONS
+
 # Read broker and backend URLs from environment variables
 # These are used as fallback defaults if not provided via Flask config
 BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://127.0.0.1:6379/0")
 RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://127.0.0.1:6379/1")
 
+# Number of messages each worker process reserves ahead of time.
+# - 1: long-running tasks, so a busy process does not sit on queued work
+#      (also the safe choice with AMQP, where global prefetch gets heavy)
+# - 2: default, raises throughput for the mostly I/O-bound tasks here
+# - 4+: short CPU-bound tasks
+WORKER_PREFETCH_MULTIPLIER = int(os.getenv("CELERY_WORKER_PREFETCH_MULTIPLIER", "2"))
+
 # Create Celery instance with default broker and backend
 celery = Celery(
     "app",
@@ -28,17 +37,31 @@ celery.conf.update(
     timezone="UTC",
     enable_utc=True,
 
+    task_ignore_result=False,            # task_status/task_wait read results
     task_acks_late=True,                 # ACK after task completion
-    worker_prefetch_multiplier=1,        # Prevent long tasks from starving
+    worker_prefetch_multiplier=WORKER_PREFETCH_MULTIPLIER,
     task_reject_on_worker_lost=True,     # Allow retry on worker disconnect
+
+    # Hold the broker and result backend to the same per-process Redis
+    # connection limit as the app's shared pools (app.redis_pool)
+    broker_transport_options={"max_connections": REDIS_MAX_CONNECTIONS},
+    redis_max_connections=REDIS_MAX_CONNECTIONS,
 )
 
 # Queue and routing configuration (can be extended as needed)
 # Define custom queue with exchange
 celery.conf.task_queues = (
     Queue("default", Exchange("tasks"), routing_key="default", durable=True),
+    # High-rate, short tasks. Run dedicated workers with a large prefetch
+    # (e.g. --prefetch-multiplier=64) so acknowledgements are not a bottleneck.
+    Queue("fast", Exchange("tasks"), routing_key="fast", durable=True),
 )
 
+# Route short tasks to the "fast" queue; everything else stays on "default"
+celery.conf.task_routes = {
+    "app.tasks.add": {"queue": "fast", "routing_key": "fast"},
+}
+
 # Set default queue, exchange, and routing key
 # This ensures all tasks are sent to the "default" queue unless explicitly specified
 celery.conf.task_default_queue = "default"
@@ -47,6 +70,25 @@ celery.conf.task_default_exchange_type = "direct"
 celery.conf.task_default_routing_key = "default"
 
 
+# Flask config keys (CELERY_* prefix) -> Celery 5.x keys (lowercase, no prefix)
+_CONFIG_MAPPING = (
+    ("CELERY_BROKER_URL", "broker_url"),
+    ("CELERY_RESULT_BACKEND", "result_backend"),
+    ("CELERY_TASK_SERIALIZER", "task_serializer"),
+    ("CELERY_RESULT_SERIALIZER", "result_serializer"),
+    ("CELERY_ACCEPT_CONTENT", "accept_content"),
+    ("CELERY_TIMEZONE", "timezone"),
+    ("CELERY_ENABLE_UTC", "enable_utc"),
+    ("CELERY_TASK_ACKS_LATE", "task_acks_late"),
+    ("CELERY_WORKER_PREFETCH_MULTIPLIER", "worker_prefetch_multiplier"),
+    ("CELERY_TASK_REJECT_ON_WORKER_LOST", "task_reject_on_worker_lost"),
+    ("CELERY_TASK_ALWAYS_EAGER", "task_always_eager"),
+    ("CELERY_TASK_EAGER_PROPAGATES", "task_eager_propagates"),
+)
+
+_MISSING = object()
+
+
 def init_celery(app=None):
     """Initialize Celery with Flask app context support.
     
@@ -70,30 +112,15 @@ def init_celery(app=None):
         >>> celery = init_celery(app)
     """
     if app is not None:
-        # Convert Flask config to Celery 5.x compatible format
-        # Celery 5.x uses lowercase keys without CELERY_ prefix
+        # Convert Flask config to Celery 5.x compatible format in one pass.
+        # Popping the old CELERY_* keys is CRITICAL: Celery 5.x's
+        # detect_settings() scans Flask config and raises ImproperlyConfigured
+        # if it finds old-style keys mixed with new ones.
         celery_config = {}
-        
-        # Map Flask config keys (CELERY_*) to Celery 5.x format (lowercase)
-        # This ensures compatibility with Celery 5.x which doesn't allow
-        # mixing old and new configuration key formats
-        config_mapping = {
-            'CELERY_BROKER_URL': 'broker_url',
-            'CELERY_RESULT_BACKEND': 'result_backend',
-            'CELERY_TASK_SERIALIZER': 'task_serializer',
-            'CELERY_RESULT_SERIALIZER': 'result_serializer',
-            'CELERY_ACCEPT_CONTENT': 'accept_content',
-            'CELERY_TIMEZONE': 'timezone',
-            'CELERY_ENABLE_UTC': 'enable_utc',
-            'CELERY_TASK_ACKS_LATE': 'task_acks_late',
-            'CELERY_WORKER_PREFETCH_MULTIPLIER': 'worker_prefetch_multiplier',
-            'CELERY_TASK_REJECT_ON_WORKER_LOST': 'task_reject_on_worker_lost',
-        }
-        
-        # Convert Flask config keys to Celery 5.x format
-        for flask_key, celery_key in config_mapping.items():
-            if flask_key in app.config:
-                celery_config[celery_key] = app.config[flask_key]
+        for flask_key, celery_key in _CONFIG_MAPPING:
+            value = app.config.pop(flask_key, _MISSING)
+            if value is not _MISSING:
+                celery_config[celery_key] = value
         
         # Update Celery config with converted values
         # This will override the default broker/backend if Flask config
@@ -101,14 +128,6 @@ def init_celery(app=None):
         if celery_config:
             celery.conf.update(celery_config)
         
-        # CRITICAL: Remove old CELERY_* keys from Flask config to prevent
-        # Celery from detecting mixed old/new configuration keys.
-        # Celery 5.x's detect_settings() scans Flask config and will raise
-        # ImproperlyConfigured if it finds old-style keys.
-        for flask_key in config_mapping.keys():
-            if flask_key in app.config:
-                del app.config[flask_key]
-        
         # Store Flask app reference for use in tasks that need app context
         celery.app = app
     
@@ -21,7 +21,11 @@ class BaseConfig:
     """Base configuration shared across environments."""
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    CACHE_TYPE = "SimpleCache"
+    # Shared Redis cache so memoized results are reused across gunicorn
+    # workers and Celery processes instead of being cached per process
+    CACHE_TYPE = "RedisCache"
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://127.0.0.1:6379/2")
+    CACHE_KEY_PREFIX = "uapi:"
     # SECRET_KEY must be set via environment variable
     # For development, use .env file. For production, set via environment.
     SECRET_KEY = _get_secret_key()
@@ -7,6 +7,8 @@ from .base import BaseConfig
 class DevelopmentConfig(BaseConfig):
     DEBUG = True
     TESTING = False
+    # Log registered routes at startup (emitted with LOG_LEVEL=DEBUG)
+    LOG_ROUTES_ON_BOOT = True
     # Development config can have defaults, but prefer .env file
     SQLALCHEMY_DATABASE_URI = os.getenv(
         "DATABASE_URL",
@@ -13,6 +13,10 @@ class ProductionConfig(BaseConfig):
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "")
     CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "")
     CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "")
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "")
+    # Workers inherit the engine from the preloading gunicorn arbiter; check
+    # pooled connections before use so a dropped one never reaches a request
+    SQLALCHEMY_ENGINE_OPTIONS = {"pool_pre_ping": True}
 
     @classmethod
     def validate(cls):
@@ -22,6 +26,7 @@ class ProductionConfig(BaseConfig):
             "DATABASE_URL": cls.SQLALCHEMY_DATABASE_URI,
             "CELERY_BROKER_URL": cls.CELERY_BROKER_URL,
             "CELERY_RESULT_BACKEND": cls.CELERY_RESULT_BACKEND,
+            "CACHE_REDIS_URL": cls.CACHE_REDIS_URL,
         }
         missing = [var for var, value in required_vars.items() if not value]
         if missing:
@@ -1,7 +1,10 @@
 """Connexion application factory for Swagger/OpenAPI support."""
 import logging
 import os
+from importlib.metadata import version
+from typing import Set
 import connexion
+from a2wsgi import WSGIMiddleware
 from connexion import FlaskApp
 from flask import Flask
 from dotenv import load_dotenv
@@ -12,6 +15,51 @@ logger = logging.getLogger(__name__)
 # This ensures .env is loaded before any config classes are imported
 load_dotenv()
 
+from app.config import DevelopmentConfig, ProductionConfig, TestingConfig  # noqa: E402
+
+# Config name -> config class; unknown names fall back to development
+_CONFIGS = {
+    "development": DevelopmentConfig,
+    "production": ProductionConfig,
+    "testing": TestingConfig,
+}
+
+# Threads per worker process that run the (sync) Flask handlers. Connexion
+# bridges Flask into ASGI through a2wsgi, whose pool plays the role of
+# gunicorn's gthread --threads: a handler blocked on I/O ties up one thread,
+# not the worker's event loop.
+WSGI_THREADS = int(os.getenv("WSGI_THREADS", "10"))
+# Connexion release whose FlaskApp internals _size_wsgi_pool relies on
+# (FlaskApp._middleware_app.asgi_app is an a2wsgi WSGIMiddleware); keep in
+# sync with the connexion pin in pyproject.toml
+_CONNEXION_POOL_HOOK_VERSION = "3.0.2"
+
+# Database URLs whose tables were already created in this process
+_DB_INITIALIZED: Set[str] = set()
+
+
+def _size_wsgi_pool(connexion_app: FlaskApp, workers: int) -> None:
+    """Rebuild Connexion's WSGI bridge with a thread pool of the given size.
+    
+    Connexion has no setting for the a2wsgi pool, so this replaces a private
+    attribute. It does so only on the Connexion release it was written
+    against; on any other release a2wsgi's default pool is kept.
+    
+    Args:
+        connexion_app: Freshly created FlaskApp, before WSGI middleware is added
+        workers: Number of handler threads
+    """
+    installed = version("connexion")
+    if installed != _CONNEXION_POOL_HOOK_VERSION:
+        logger.warning(
+            "WSGI_THREADS ignored: written for connexion %s, found %s",
+            _CONNEXION_POOL_HOOK_VERSION,
+            installed,
+        )
+        return
+    middleware_app = connexion_app._middleware_app  # pylint: disable=protected-access
+    middleware_app.asgi_app = WSGIMiddleware(middleware_app.app.wsgi_app, workers=max(workers, 1))
+
 
 def create_connexion_app(config_name: str = "development", skip_db_init: bool = False) -> FlaskApp:
     """Create a Connexion application with Flask backend.
@@ -35,16 +83,9 @@ def create_connexion_app(config_name: str = "development", skip_db_init: bool =
     
     # Create Connexion app with specification directory
     # Load config first, then create app with config
-    if config_name == "production":
-        from app.config import ProductionConfig
+    config_obj = _CONFIGS.get(config_name, DevelopmentConfig)
+    if config_obj is ProductionConfig:
         ProductionConfig.validate()
-        config_obj = ProductionConfig
-    elif config_name == "testing":
-        from app.config import TestingConfig
-        config_obj = TestingConfig
-    else:
-        from app.config import DevelopmentConfig
-        config_obj = DevelopmentConfig
     
     # Create Connexion app
     # According to Connexion 3.x docs, we can create the app and add API
@@ -53,6 +94,13 @@ def create_connexion_app(config_name: str = "development", skip_db_init: bool =
     # Get the underlying Flask app to configure it
     app = connexion_app.app
     
+    # orjson for jsonify() and for the dict/list values handlers return
+    from app.utils.json_utils import OrjsonProvider
+    app.json = OrjsonProvider(app)
+    
+    # Size the handler thread pool before any WSGI middleware wraps the bridge
+    _size_wsgi_pool(connexion_app, WSGI_THREADS)
+    
     # Load configuration FIRST before adding API
     app.config.from_object(config_obj)
     
@@ -73,7 +121,16 @@ def create_connexion_app(config_name: str = "development", skip_db_init: bool =
     # Import here to avoid circular imports
     from app import db, cache
     db.init_app(app)
-    cache.init_app(app)
+    cache_config = None
+    if app.config.get("CACHE_TYPE") == "RedisCache" and app.config.get("CACHE_REDIS_URL"):
+        # Hand Flask-Caching a client on the shared pool; given a URL it would
+        # build a private pool of its own
+        from app.redis_pool import get_client
+        cache_config = {
+            "CACHE_REDIS_HOST": get_client(app.config["CACHE_REDIS_URL"]),
+            "CACHE_REDIS_URL": None,
+        }
+    cache.init_app(app, config=cache_config)
     
     # Initialize Celery with app
     from app.celery_app import init_celery
@@ -93,20 +150,18 @@ def create_connexion_app(config_name: str = "development", skip_db_init: bool =
             pythonic_params=True,
             resolver=resolver
         )
-        logger.info(f"API specification added successfully")
+        logger.info("API specification added successfully")
     except Exception as e:
-        logger.error(f"Failed to add API specification: {e}", exc_info=True)
-        import traceback
-        traceback.print_exc()
+        logger.error("Failed to add API specification: %s", e, exc_info=True)
         raise
     
     
-    # Log registered routes for debugging
-    with app.app_context():
+    # Log registered routes for debugging (opt-in via LOG_ROUTES_ON_BOOT, shown with LOG_LEVEL=DEBUG)
+    if app.config.get("LOG_ROUTES_ON_BOOT", False) and logger.isEnabledFor(logging.DEBUG):
         routes = list(app.url_map.iter_rules())
-        logger.info(f"Total routes registered: {len(routes)}")
+        logger.debug("Total routes registered: %s", len(routes))
         for rule in routes[:20]:  # Log first 20 routes
-            logger.info(f"Route: {rule.rule} -> {rule.endpoint}")
+            logger.debug("Route: %s -> %s", rule.rule, rule.endpoint)
     
     # Register error handlers
     @app.errorhandler(404)
@@ -120,10 +175,16 @@ def create_connexion_app(config_name: str = "development", skip_db_init: bool =
         db.session.rollback()
         return jsonify({"error": "Internal server error"}), 500
     
-    # Create database tables only in development/testing
+    # Create database tables only in development/testing, once per database
     if not skip_db_init and config_name in ("development", "testing"):
         with app.app_context():
-            db.create_all()
+            db_key = str(db.engine.url)
+            if db_key not in _DB_INITIALIZED:
+                db.create_all()
+                # In-memory SQLite is private to each app's engine, so every
+                # new app still needs its own schema
+                if db.engine.url.database not in (None, "", ":memory:"):
+                    _DB_INITIALIZED.add(db_key)
     
     return connexion_app
 
@@ -1,5 +1,5 @@
 """Database models."""
 
-from .user import User
+from .user import ALLOWED_ROLES, User
 
-__all__ = ["User"]
+__all__ = ["ALLOWED_ROLES", "User"]
@@ -1,6 +1,9 @@
 """User SQLAlchemy model."""
 from app import db
 
+# Valid values for User.role
+ALLOWED_ROLES = frozenset({"user", "admin"})
+
 
 class User(db.Model):
     """User model for storing user data."""
@@ -12,7 +15,7 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=True)
     # Role: 'user' or 'admin'
-    role = db.Column(db.String(20), default='user', nullable=False)
+    role = db.Column(db.String(20), default='user', nullable=False, index=True)
 
     def __repr__(self):
         return f"<User {self.username} ({self.role})>"
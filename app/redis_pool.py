@@ -0,0 +1,53 @@
+"""Shared Redis connection pools.
+
+Every component that talks to the same Redis URL (Flask-Caching, session
+storage, ...) should go through these helpers so a process keeps one pool of
+persistent connections per URL instead of each client building its own.
+redis-py pools detect forks and reset themselves, so this is safe to use
+before gunicorn/Celery fork their workers.
+"""
+import os
+from functools import lru_cache
+
+import redis
+
+# Upper bound on open connections per pool (per process)
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+
+
+@lru_cache(maxsize=None)
+def _build_pool(url: str, decode_responses: bool) -> redis.ConnectionPool:
+    return redis.ConnectionPool.from_url(
+        url,
+        decode_responses=decode_responses,
+        max_connections=REDIS_MAX_CONNECTIONS,
+    )
+
+
+def get_pool(url: str, decode_responses: bool = False) -> redis.ConnectionPool:
+    """Return the process-wide connection pool for a Redis URL.
+
+    Args:
+        url: Redis URL, e.g. redis://127.0.0.1:6379/2
+        decode_responses: Whether clients on this pool decode replies to str
+
+    Returns:
+        Shared ConnectionPool instance
+    """
+    # Normalise arguments so every call style hits the same cache entry
+    return _build_pool(url, bool(decode_responses))
+
+
+def get_client(url: str, decode_responses: bool = False) -> redis.Redis:
+    """Return a Redis client backed by the shared pool for a URL.
+
+    Clients are cheap wrappers; all state lives in the pool.
+
+    Args:
+        url: Redis URL
+        decode_responses: Whether replies are decoded to str
+
+    Returns:
+        Redis client instance
+    """
+    return redis.Redis(connection_pool=get_pool(url, decode_responses))
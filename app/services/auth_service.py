@@ -1,23 +1,57 @@
 """Authentication service using JWT and Redis for session management."""
+import asyncio
 import os
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import bcrypt
 import redis
-from typing import Optional, Dict, Any, Tuple
-from passlib.context import CryptContext
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from typing import Optional, Dict, Any, Iterable, List, Tuple
+from urllib.parse import quote, urlparse
 from sqlalchemy.exc import IntegrityError
 
 from app import db
-from app.models import User
+from app.models import ALLOWED_ROLES, User
+from app.redis_pool import get_client
+from app.utils import json_utils
 from app.utils.jwt_utils import (
     generate_access_token,
     generate_refresh_token,
     decode_token,
+    is_provider_token,
+    peek_claims,
 )
 
 logger = logging.getLogger(__name__)
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Argon2id parameters. Time cost is the number of passes, memory cost is in
+# KiB per hash and parallelism is the number of lanes; tune per deployment so
+# a login stays well under the latency budget on the target hardware.
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "2"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))  # 64 MiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "2"))
+
+# New passwords are hashed with Argon2id (argon2-cffi C backend). Legacy
+# bcrypt hashes still verify and are upgraded on the next successful login.
+_password_hasher = PasswordHasher(
+    time_cost=ARGON2_TIME_COST,
+    memory_cost=ARGON2_MEMORY_COST,
+    parallelism=ARGON2_PARALLELISM,
+)
+_BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+
+# Hashing runs in the request's worker thread (Connexion executes sync Flask
+# handlers in a thread pool), so it never blocks the ASGI event loop.
+# Coroutines use the a*-variants below, which hash on a dedicated pool; the
+# C backends release the GIL, so these threads hash in parallel.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+_hash_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS,
+    thread_name_prefix="pwhash",
+)
 
 # Redis connection for session storage
 # Try to use Celery broker URL if available, otherwise use separate Redis config
@@ -30,19 +64,21 @@ REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", None)
 # Session TTL (seconds) - should match JWT access token expiry
 SESSION_TTL = int(os.getenv("SESSION_TTL", "1800"))  # 30 minutes
 
+# Redis set of user ids whose refresh tokens must no longer be honoured
+REVOKED_USERS_KEY = "revoked_users"
 
-def get_redis_client() -> redis.Redis:
-    """Get Redis client for session storage.
+
+def _resolve_redis_settings() -> Dict[str, Any]:
+    """Resolve session Redis connection settings.
     
     Parses Redis connection from CELERY_BROKER_URL or uses explicit config.
     
     Returns:
-        Redis client instance
+        Dict with host, port, db and password
     """
     # Parse Redis URL from CELERY_BROKER_URL if available
     if CELERY_BROKER_URL.startswith("redis://"):
         try:
-            from urllib.parse import urlparse
             parsed = urlparse(CELERY_BROKER_URL)
             host = REDIS_HOST or parsed.hostname or "127.0.0.1"
             port = REDIS_PORT if REDIS_HOST else (parsed.port or 6379)
@@ -62,13 +98,55 @@ def get_redis_client() -> redis.Redis:
         db = REDIS_DB
         password = REDIS_PASSWORD
     
-    return redis.Redis(
-        host=host,
-        port=port,
-        db=db,
-        password=password,
-        decode_responses=True,
-    )
+    return {"host": host, "port": port, "db": db, "password": password}
+
+
+def _settings_to_url(settings: Dict[str, Any]) -> str:
+    """Build a redis:// URL from resolved host/port/db/password settings."""
+    auth = f":{quote(settings['password'], safe='')}@" if settings["password"] else ""
+    return f"redis://{auth}{settings['host']}:{settings['port']}/{settings['db']}"
+
+
+# Parsed once at import; the client below is created lazily on first use
+_REDIS_SESSION_URL = _settings_to_url(_resolve_redis_settings())
+_redis_client: Optional[redis.Redis] = None
+_redis_client_lock = threading.Lock()
+
+
+def get_redis_client() -> redis.Redis:
+    """Get the shared Redis client for session storage.
+    
+    The client is created once per process on the shared pool for the
+    session URL (app.redis_pool), so requests reuse persistent connections
+    instead of dialing Redis each time.
+    
+    Returns:
+        Redis client instance
+    """
+    global _redis_client
+    if _redis_client is None:
+        with _redis_client_lock:
+            if _redis_client is None:
+                _redis_client = get_client(_REDIS_SESSION_URL, decode_responses=True)
+    return _redis_client
+
+
+def _token_fingerprint(token: str) -> str:
+    """Return a short per-token identifier for Redis session/blacklist keys.
+    
+    Uses the JWT signature segment: it is unique per token, whereas a fixed
+    length prefix only covers the header, which is identical for every token.
+    """
+    return token.rsplit(".", 1)[-1]
+
+
+@lru_cache(maxsize=1)
+def _dummy_hash() -> str:
+    """Return a fixed hash at the configured cost for timing-safe failures.
+    
+    Computed on first use rather than at import to keep startup fast.
+    """
+    return AuthService.hash_password("x" * 16)
 
 
 class AuthService:
@@ -76,7 +154,7 @@ class AuthService:
 
     @staticmethod
     def hash_password(password: str) -> str:
-        """Hash a password using bcrypt.
+        """Hash a password using Argon2id.
         
         Args:
             password: Plain text password
@@ -84,11 +162,75 @@ class AuthService:
         Returns:
             Hashed password
         """
-        return pwd_context.hash(password)
+        return _password_hasher.hash(password)
 
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
-        """Verify a password against a hash.
+        """Verify a password against an Argon2 or legacy bcrypt hash.
+        
+        Args:
+            plain_password: Plain text password
+            hashed_password: Hashed password
+        
+        Returns:
+            True if password matches, False otherwise
+        """
+        if hashed_password.startswith(_BCRYPT_PREFIXES):
+            try:
+                return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+            except ValueError:
+                # Malformed bcrypt hash
+                return False
+        try:
+            return _password_hasher.verify(hashed_password, plain_password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    @staticmethod
+    def password_needs_rehash(hashed_password: str) -> bool:
+        """Check whether a stored hash should be replaced.
+        
+        Args:
+            hashed_password: Hashed password
+        
+        Returns:
+            True for legacy bcrypt hashes and Argon2 hashes with outdated parameters
+        """
+        if hashed_password.startswith(_BCRYPT_PREFIXES):
+            return True
+        try:
+            return _password_hasher.check_needs_rehash(hashed_password)
+        except InvalidHashError:
+            return True
+
+    @staticmethod
+    def hash_passwords(passwords: Iterable[str]) -> List[str]:
+        """Hash many passwords in parallel, e.g. for bulk imports or re-hashing.
+        
+        Args:
+            passwords: Plain text passwords
+        
+        Returns:
+            Hashes in the same order as the input
+        """
+        return list(_hash_executor.map(AuthService.hash_password, passwords))
+
+    @staticmethod
+    async def ahash_password(password: str) -> str:
+        """Hash a password without blocking the event loop.
+        
+        Args:
+            password: Plain text password
+        
+        Returns:
+            Hashed password
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, AuthService.hash_password, password)
+
+    @staticmethod
+    async def averify_password(plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against a hash without blocking the event loop.
         
         Args:
             plain_password: Plain text password
@@ -97,7 +239,10 @@ class AuthService:
         Returns:
             True if password matches, False otherwise
         """
-        return pwd_context.verify(plain_password, hashed_password)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _hash_executor, AuthService.verify_password, plain_password, hashed_password
+        )
 
     @staticmethod
     def register_user(username: str, email: str, password: str, role: str = "user") -> Tuple[Dict[str, Any], int]:
@@ -113,18 +258,13 @@ class AuthService:
             Tuple of (response dict, status code)
         """
         # Validate role
-        if role not in ["user", "admin"]:
+        if role not in ALLOWED_ROLES:
             logger.warning("Invalid role provided during registration: %s", role)
             return {"error": "Role must be either 'user' or 'admin'"}, 400
         
-        # Check if user already exists
-        existing_user = User.query.filter(
-            (User.username == username) | (User.email == email)
-        ).first()
-        
-        if existing_user:
-            logger.warning("User registration failed - user already exists: %s / %s", username, email)
-            return {"error": "User with this username or email already exists"}, 409
+        # No existence pre-check: the unique constraints on username/email
+        # reject duplicates at INSERT time, handled by the IntegrityError path
+        # below, which saves a SELECT on every successful registration
         
         # Create new user with hashed password
         password_hash = AuthService.hash_password(password)
@@ -162,18 +302,33 @@ class AuthService:
         """
         user = User.query.filter_by(username=username).first()
         
+        # Unknown users still pay for a full password hash check so response time
+        # does not reveal which usernames exist
         if not user:
             logger.warning("Authentication failed - user not found: %s", username)
+            AuthService.verify_password(password, _dummy_hash())
             return None
         
         if not user.password_hash:
             logger.warning("Authentication failed - user has no password set: %s", username)
+            AuthService.verify_password(password, _dummy_hash())
             return None
         
         if not AuthService.verify_password(password, user.password_hash):
             logger.warning("Authentication failed - invalid password for user: %s", username)
             return None
         
+        # Upgrade legacy bcrypt (or outdated Argon2) hashes while the plain
+        # password is at hand; a failed upgrade must not fail the login
+        if AuthService.password_needs_rehash(user.password_hash):
+            try:
+                user.password_hash = AuthService.hash_password(password)
+                db.session.commit()
+                logger.info("Password hash upgraded for user: %s", username)
+            except Exception as exc:
+                db.session.rollback()
+                logger.error("Failed to upgrade password hash for %s: %s", username, exc)
+        
         logger.info("User authenticated successfully: %s", username)
         return user
 
@@ -198,7 +353,8 @@ class AuthService:
         refresh_token = generate_refresh_token(user.id, user.username, user.role)
         
         # Store session in Redis for single sign-on
-        session_key = f"session:{user.id}:{access_token[:16]}"  # Use token prefix for uniqueness
+        fingerprint = _token_fingerprint(access_token)
+        session_key = f"session:{user.id}:{fingerprint}"
         redis_client = get_redis_client()
         
         try:
@@ -208,18 +364,24 @@ class AuthService:
                 "role": user.role,
                 "token": access_token,
             }
-            # Store session with TTL
-            redis_client.setex(
-                session_key,
-                SESSION_TTL,
-                str(user.id),  # Store user_id as value for quick lookup
-            )
-            # Also store full session data
-            redis_client.setex(
-                f"session_data:{user.id}",
-                SESSION_TTL,
-                str(session_data),
-            )
+            # Queue all writes and send them in a single round-trip
+            with redis_client.pipeline(transaction=False) as pipe:
+                # Store session with TTL
+                pipe.setex(
+                    session_key,
+                    SESSION_TTL,
+                    str(user.id),  # Store user_id as value for quick lookup
+                )
+                # Index the user's active tokens so lookups never scan the keyspace
+                pipe.sadd(f"user_sessions:{user.id}", fingerprint)
+                pipe.expire(f"user_sessions:{user.id}", SESSION_TTL)
+                # Also store full session data
+                pipe.setex(
+                    f"session_data:{user.id}",
+                    SESSION_TTL,
+                    json_utils.dumps(session_data),
+                )
+                pipe.execute()
             logger.info("Session stored in Redis for user: %s", username)
         except Exception as e:
             logger.error("Failed to store session in Redis: %s", e, exc_info=True)
@@ -252,20 +414,21 @@ class AuthService:
         redis_client = get_redis_client()
         
         try:
-            # Find and remove all sessions for this user
-            session_pattern = f"session:{user_id}:*"
-            keys = redis_client.keys(session_pattern)
-            
-            for key in keys:
-                redis_client.delete(key)
-            
-            # Remove session data
-            redis_client.delete(f"session_data:{user_id}")
-            
-            # Also add token to blacklist (optional, for extra security)
-            token_prefix = token[:16]
-            blacklist_key = f"blacklist:{token_prefix}"
-            redis_client.setex(blacklist_key, SESSION_TTL, "1")
+            blacklist_key = f"blacklist:{_token_fingerprint(token)}"
+            with redis_client.pipeline(transaction=False) as pipe:
+                # Provider tokens carry no user_id and have no local sessions
+                if user_id is not None:
+                    # Remove all sessions for this user, their index and session data
+                    sessions_key = f"user_sessions:{user_id}"
+                    fingerprints = redis_client.smembers(sessions_key)
+                    pipe.delete(
+                        *(f"session:{user_id}:{fp}" for fp in fingerprints),
+                        sessions_key,
+                        f"session_data:{user_id}",
+                    )
+                # Also add token to blacklist (optional, for extra security)
+                pipe.setex(blacklist_key, SESSION_TTL, "1")
+                pipe.execute()
             
             logger.info("User logged out successfully: user_id=%s", user_id)
             return {"message": "Logged out successfully"}, 200
@@ -273,6 +436,29 @@ class AuthService:
             logger.error("Failed to logout user: %s", e, exc_info=True)
             return {"error": "Failed to logout"}, 500
 
+    @staticmethod
+    def revoke_user(user_id: int) -> None:
+        """Revoke all tokens of a user, e.g. when the account is deleted.
+        
+        Marks the user as revoked so refresh tokens are rejected and drops
+        their active sessions so access tokens stop verifying.
+        
+        Args:
+            user_id: User ID
+        """
+        redis_client = get_redis_client()
+        sessions_key = f"user_sessions:{user_id}"
+        fingerprints = redis_client.smembers(sessions_key)
+        with redis_client.pipeline(transaction=False) as pipe:
+            pipe.sadd(REVOKED_USERS_KEY, str(user_id))
+            pipe.delete(
+                *(f"session:{user_id}:{fp}" for fp in fingerprints),
+                sessions_key,
+                f"session_data:{user_id}",
+            )
+            pipe.execute()
+        logger.info("Revoked tokens for user_id=%s", user_id)
+
     @staticmethod
     def verify_session(token: str) -> Optional[Dict[str, Any]]:
         """Verify a JWT token and check if session exists in Redis.
@@ -283,34 +469,46 @@ class AuthService:
         Returns:
             Decoded token payload if valid and session exists, None otherwise
         """
-        # Decode token
-        payload = decode_token(token)
-        if not payload:
+        # Peek at the unverified claims to derive the Redis keys; the
+        # signature is only checked once the cheap Redis checks have passed
+        claims = peek_claims(token)
+        if not claims:
             return None
         
+        # Tokens from the external OIDC provider have no local session; they
+        # are only subject to the logout blacklist and their own signature
+        if is_provider_token(claims):
+            if get_redis_client().exists(f"blacklist:{_token_fingerprint(token)}"):
+                logger.warning("Token is blacklisted")
+                return None
+            return decode_token(token)
+        
         # Check token type
-        if payload.get("type") != "access":
-            logger.warning("Invalid token type: %s", payload.get("type"))
+        if claims.get("type") != "access":
+            logger.warning("Invalid token type: %s", claims.get("type"))
             return None
         
-        # Check if token is blacklisted
+        # Check blacklist and the token's own session key in a single
+        # round-trip; both keys derive from the token, so each is an O(1)
+        # EXISTS and the session expires with its own TTL
         redis_client = get_redis_client()
-        token_prefix = token[:16]
-        blacklist_key = f"blacklist:{token_prefix}"
-        if redis_client.exists(blacklist_key):
+        fingerprint = _token_fingerprint(token)
+        user_id = claims.get("user_id")
+        with redis_client.pipeline(transaction=False) as pipe:
+            pipe.exists(f"blacklist:{fingerprint}")
+            pipe.exists(f"session:{user_id}:{fingerprint}")
+            blacklisted, has_session = pipe.execute()
+        
+        if blacklisted:
             logger.warning("Token is blacklisted")
             return None
         
-        # Check if session exists in Redis
-        user_id = payload.get("user_id")
-        session_key_pattern = f"session:{user_id}:*"
-        session_keys = redis_client.keys(session_key_pattern)
-        
-        if not session_keys:
+        if not has_session:
             logger.warning("Session not found in Redis for user_id: %s", user_id)
             return None
         
-        return payload
+        # Verify signature and expiry last (the payload is the same one peeked)
+        return decode_token(token)
 
     @staticmethod
     def refresh_access_token(refresh_token: str) -> Tuple[Dict[str, Any], int]:
@@ -333,19 +531,25 @@ class AuthService:
         user_id = payload.get("user_id")
         username = payload.get("username")
         
-        # Get user to verify they still exist
-        user = User.query.get(user_id)
-        if not user:
+        # The refresh token is signed by us and carries the role, so trust its
+        # claims; deleted/revoked users are tracked in a Redis set instead of
+        # re-reading the user row on every refresh
+        redis_client = get_redis_client()
+        if redis_client.sismember(REVOKED_USERS_KEY, str(user_id)):
             return {"error": "User not found"}, 404
         
         # Generate new access token
-        access_token = generate_access_token(user_id, username, user.role)
+        access_token = generate_access_token(user_id, username, payload.get("role"))
         
         # Update session in Redis
-        redis_client = get_redis_client()
-        session_key = f"session:{user_id}:{access_token[:16]}"
+        fingerprint = _token_fingerprint(access_token)
+        session_key = f"session:{user_id}:{fingerprint}"
         try:
-            redis_client.setex(session_key, SESSION_TTL, str(user_id))
+            with redis_client.pipeline(transaction=False) as pipe:
+                pipe.setex(session_key, SESSION_TTL, str(user_id))
+                pipe.sadd(f"user_sessions:{user_id}", fingerprint)
+                pipe.expire(f"user_sessions:{user_id}", SESSION_TTL)
+                pipe.execute()
             logger.info("Refreshed access token for user: %s", username)
         except Exception as e:
             logger.error("Failed to update session in Redis: %s", e)
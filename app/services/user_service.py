@@ -1,28 +1,47 @@
 """User service for business logic."""
 import logging
+from app import db
 from app.models import User
 from typing import Any, Tuple, List, Dict
 
 logger = logging.getLogger(__name__)
 
+# Page size for list endpoints
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
 
 class UserService:
     """Service for user management."""
 
     @staticmethod
-    def get_all_users() -> Tuple[List[Dict[str, Any]], int]:
-        """Get all users.
+    def get_all_users(limit: int = DEFAULT_PAGE_SIZE, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """Get a page of users.
+        
+        Selects only the returned columns, so rows come back as plain tuples
+        instead of fully hydrated ORM objects.
+        
+        Args:
+            limit: Maximum number of users to return (capped at MAX_PAGE_SIZE)
+            offset: Number of users to skip, ordered by id
         
         Returns:
             Tuple of (list of user dicts, status code)
         """
-        users = User.query.all()
+        limit = max(0, min(limit, MAX_PAGE_SIZE))
+        offset = max(0, offset)
+        rows = db.session.execute(
+            db.select(User.id, User.username, User.email, User.role)
+            .order_by(User.id)
+            .limit(limit)
+            .offset(offset)
+        ).all()
         user_list = [
             {
-                "id": user.id,
-                "username": user.username,
-                "email": user.email,
-                "role": user.role
-            } for user in users
+                "id": user_id,
+                "username": username,
+                "email": email,
+                "role": role
+            } for user_id, username, email, role in rows
         ]
         return user_list, 200
@@ -1,10 +1,22 @@
+import os
 import time
 import logging
 from app.celery_app import celery
 
 logger = logging.getLogger(__name__)
 
-@celery.task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_kwargs={"max_retries": 3})
+# Artificial per-task delay in seconds for demos/load tests; 0 disables it
+SIMULATE_TASK_DELAY = float(os.getenv("SIMULATE_TASK_DELAY", "0"))
+
+# acks_late=False: ack on receipt so the fast-queue workers are not limited
+# by one ack round-trip per result; add is cheap and safe to lose on a crash.
+@celery.task(
+    bind=True,
+    acks_late=False,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    retry_kwargs={"max_retries": 3},
+)
 def add(self, x: int, y: int):
     """Simple add task that can optionally run within Flask app context.
     
@@ -15,9 +27,12 @@ def add(self, x: int, y: int):
     Returns:
         Sum of x and y
     """
-    logger.info(f"Executing add task: {x} + {y}")
-    logger.debug(f"Celery broker URL: {celery.conf.broker_url}")
-    time.sleep(1)  # Simulate processing time
+    logger.info("Executing add task: %s + %s", x, y)
+    if logger.isEnabledFor(logging.DEBUG):
+        # broker_url is a config lookup; only resolve it when it will be logged
+        logger.debug("Celery broker URL: %s", celery.conf.broker_url)
+    if SIMULATE_TASK_DELAY > 0:
+        time.sleep(SIMULATE_TASK_DELAY)  # Simulate processing time
     
     # If app is available, run within app context
     if hasattr(celery, 'app') and celery.app is not None:
@@ -26,5 +41,5 @@ def add(self, x: int, y: int):
             pass
     
     result = x + y
-    logger.info(f"Task completed: {x} + {y} = {result}")
+    logger.info("Task completed: %s + %s = %s", x, y, result)
     return result
@@ -1,14 +1,87 @@
 """Authentication decorator for protecting routes."""
+import hashlib
 import logging
+import os
+import sys
+import threading
+import time
 from functools import wraps
 from flask import request, jsonify
-from typing import Callable, Any
+from typing import Callable, Any, Dict, Optional
 
-from app.utils.jwt_utils import get_token_from_header, decode_token
+from cachetools import TTLCache
+
+from app.utils.jwt_utils import get_token_from_header, forget_token
 from app.services.auth_service import AuthService
 
 logger = logging.getLogger(__name__)
 
+# Verified-token cache configuration
+# Claims of a successfully verified token are reused for a short window so
+# repeated requests with the same token skip signature verification and the
+# Redis session lookups. Set AUTH_VERIFY_CACHE_TTL=0 or AUTH_VERIFY_CACHE_MAX=0
+# to disable.
+AUTH_VERIFY_CACHE_TTL = int(os.getenv("AUTH_VERIFY_CACHE_TTL", "5"))
+AUTH_VERIFY_CACHE_MAX = int(os.getenv("AUTH_VERIFY_CACHE_MAX", "10000"))
+
+# Maps SHA-256(token) -> (claims, expires_at). Only valid tokens are stored.
+_verify_cache: TTLCache = TTLCache(maxsize=max(AUTH_VERIFY_CACHE_MAX, 1), ttl=max(AUTH_VERIFY_CACHE_TTL, 1))
+_verify_cache_lock = threading.Lock()
+
+
+def _cache_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+def verify_token(token: str) -> Optional[Dict[str, Any]]:
+    """Verify a token, reusing recently validated claims when possible.
+    
+    Wraps AuthService.verify_session with a bounded TTL cache. Entries expire
+    after AUTH_VERIFY_CACHE_TTL seconds or at the token's own ``exp``,
+    whichever comes first. Invalid tokens are never cached.
+    
+    Also used as the OpenAPI ``x-bearerInfoFunc`` so that Connexion's security
+    check and @require_auth share a single verification per token.
+    
+    Args:
+        token: JWT access token
+    
+    Returns:
+        Decoded token payload if valid and session exists, None otherwise
+    """
+    if AUTH_VERIFY_CACHE_TTL <= 0 or AUTH_VERIFY_CACHE_MAX <= 0:
+        return AuthService.verify_session(token)
+    
+    key = _cache_key(token)
+    now = time.time()
+    with _verify_cache_lock:
+        entry = _verify_cache.get(key)
+    if entry is not None and entry[1] > now:
+        return entry[0]
+    
+    payload = AuthService.verify_session(token)
+    if payload:
+        expires_at = now + AUTH_VERIFY_CACHE_TTL
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+        with _verify_cache_lock:
+            _verify_cache[key] = (payload, expires_at)
+    return payload
+
+
+def invalidate_token(token: str) -> None:
+    """Drop a token from the verified- and decoded-token caches (e.g. on logout)."""
+    with _verify_cache_lock:
+        _verify_cache.pop(_cache_key(token), None)
+    forget_token(token)
+
+
+def clear_verify_cache() -> None:
+    """Remove all entries from the verified-token cache."""
+    with _verify_cache_lock:
+        _verify_cache.clear()
+
 
 def require_auth(f: Callable) -> Callable:
     """Decorator to require authentication for a route.
@@ -17,6 +90,7 @@ def require_auth(f: Callable) -> Callable:
         @require_auth
         def protected_route():
             # Access current user via request.current_user
+            # and the bearer token via request.current_token
             return {"user_id": request.current_user["user_id"]}
     """
     @wraps(f)
@@ -30,14 +104,15 @@ def require_auth(f: Callable) -> Callable:
             return jsonify({"error": "Authentication required"}), 401
         
         # Verify token and session
-        payload = AuthService.verify_session(token)
+        payload = verify_token(token)
         
         if not payload:
             logger.warning("Invalid or expired token")
             return jsonify({"error": "Invalid or expired token"}), 401
         
-        # Attach user info to request object
+        # Attach user info and the raw token so handlers don't re-parse the header
         request.current_user = payload
+        request.current_token = token
         
         return f(*args, **kwargs)
     
@@ -66,7 +141,7 @@ def optional_auth(f: Callable) -> Callable:
         token = get_token_from_header(auth_header)
         
         if token:
-            payload = AuthService.verify_session(token)
+            payload = verify_token(token)
             if payload:
                 request.current_user = payload
             else:
@@ -79,8 +154,8 @@ def optional_auth(f: Callable) -> Callable:
     return decorated_function
 
 
-def require_role(role: str) -> Callable:
-    """Decorator to require a specific role for a route.
+def require_role(*roles: str) -> Callable:
+    """Decorator to require one of the given roles for a route.
     
     Must be used AFTER @require_auth or in conjunction with token verification.
     
@@ -90,6 +165,10 @@ def require_role(role: str) -> Callable:
         def admin_route():
             return {"message": "Admin only"}
     """
+    # Built once at decoration time so each request is a single hash lookup;
+    # interned so a matching (interned) role claim compares by identity
+    allowed_roles = frozenset(sys.intern(role) for role in roles)
+
     def decorator(f: Callable) -> Callable:
         @wraps(f)
         def decorated_function(*args: Any, **kwargs: Any) -> Any:
@@ -99,8 +178,8 @@ def require_role(role: str) -> Callable:
                 return jsonify({"error": "Authentication required"}), 401
             
             user_role = request.current_user.get("role")
-            if user_role != role:
-                logger.warning("Role check failed: User role '%s' != required '%s'", user_role, role)
+            if user_role not in allowed_roles:
+                logger.warning("Role check failed: User role '%s' not in %s", user_role, sorted(allowed_roles))
                 return jsonify({"error": "Forbidden: Insufficient permissions"}), 403
             
             return f(*args, **kwargs)
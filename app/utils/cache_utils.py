@@ -0,0 +1,66 @@
+"""Caching helpers built on top of Flask-Caching."""
+import logging
+import time
+from typing import Any, Callable, Optional
+
+from flask_caching import Cache
+
+logger = logging.getLogger(__name__)
+
+# Back-off bounds (seconds) while waiting for another worker to fill the cache
+_POLL_INITIAL_DELAY = 0.05
+_POLL_MAX_DELAY = 0.5
+
+
+def singleflight(
+    cache: Cache,
+    key: str,
+    loader: Callable[[], Any],
+    timeout: Optional[int] = None,
+    lock_timeout: int = 10,
+) -> Any:
+    """Return a cached value, letting only one caller recompute it on a miss.
+    
+    On a miss, callers race for a `lock:<key>` entry created with
+    ``cache.add`` (SET NX with an expiry on Redis). The winner runs ``loader``
+    and stores the result; everyone else polls the cache with exponential
+    back-off (50ms -> 500ms) until the value appears. If the lock holder does
+    not deliver within ``lock_timeout`` seconds, the waiter loads the value
+    itself so a crashed worker cannot block requests forever.
+    
+    ``None`` is treated as a miss, so loaders should not return it.
+    
+    Args:
+        cache: Flask-Caching instance
+        key: Cache key for the value
+        loader: Zero-argument callable producing the value
+        timeout: Cache timeout for the value (None uses the cache default)
+        lock_timeout: Seconds before the recompute lock expires
+    
+    Returns:
+        The cached or freshly loaded value
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+    
+    lock_key = f"lock:{key}"
+    deadline = time.monotonic() + lock_timeout
+    delay = _POLL_INITIAL_DELAY
+    while True:
+        if cache.add(lock_key, 1, timeout=lock_timeout):
+            try:
+                value = loader()
+                cache.set(key, value, timeout=timeout)
+                return value
+            finally:
+                cache.delete(lock_key)
+        
+        time.sleep(delay)
+        value = cache.get(key)
+        if value is not None:
+            return value
+        if time.monotonic() >= deadline:
+            logger.warning("Timed out waiting for %s to be computed, loading it directly", key)
+            return loader()
+        delay = min(delay * 2, _POLL_MAX_DELAY)
@@ -0,0 +1,70 @@
+"""Fast JSON helpers.
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise, so callers never have to care which one is available.
+"""
+import json
+from typing import Any, Union
+
+from connexion.frameworks.flask import FlaskJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+# Naive datetimes are UTC and rendered with a trailing "Z", as Connexion does
+_ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+    if orjson is not None
+    else 0
+)
+
+
+def dumps(data: Any) -> Union[bytes, str]:
+    """Serialize data to compact JSON.
+
+    Args:
+        data: JSON-serializable object
+
+    Returns:
+        UTF-8 bytes with orjson, a str with the stdlib fallback
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":"))
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parse JSON produced by dumps().
+
+    Args:
+        data: JSON bytes or str
+
+    Returns:
+        Deserialized object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class OrjsonProvider(FlaskJSONProvider):
+    """Flask JSON provider that encodes with orjson.
+
+    Connexion serializes handler return values through ``flask.json``, so
+    installing this as ``app.json`` covers both jsonify() and plain dict/list
+    returns. Output is compact and unsorted; formatting arguments such as
+    ``indent`` are ignored. Types orjson does not know (Decimal, ...) go
+    through Connexion's defaults.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=_ORJSON_OPTIONS).decode()
+
+    def loads(self, s: Union[bytes, str], **kwargs: Any) -> Any:
+        if orjson is None:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
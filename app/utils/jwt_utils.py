@@ -1,23 +1,108 @@
 """JWT utility functions for token generation and validation."""
 import os
+import threading
+import time
+import uuid
 import jwt
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+
+from cachetools import TTLCache
 
 logger = logging.getLogger(__name__)
 
 # JWT configuration
 # JWT_SECRET_KEY defaults to SECRET_KEY if not set, but SECRET_KEY should always be set
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY") or os.getenv("SECRET_KEY")
-if not JWT_SECRET_KEY:
-    raise ValueError(
-        "JWT_SECRET_KEY or SECRET_KEY environment variable is required. "
-        "Please set it in .env file or as an environment variable."
-    )
-JWT_ALGORITHM = "HS256"
+# HS256 (shared secret) by default. Use "EdDSA" with an Ed25519 key pair when
+# tokens must be verifiable without sharing the signing secret.
+JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+# PEM-encoded keys for asymmetric algorithms ("\n" escapes are accepted)
+JWT_PRIVATE_KEY = os.getenv("JWT_PRIVATE_KEY")
+JWT_PUBLIC_KEY = os.getenv("JWT_PUBLIC_KEY")
+# Optional key id written to the token header to support key rotation
+JWT_KEY_ID = os.getenv("JWT_KEY_ID") or None
 JWT_ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 JWT_REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("JWT_REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+# Optional issuer/audience; written to issued tokens and validated on decode
+JWT_ISSUER = os.getenv("JWT_ISSUER") or None
+JWT_AUDIENCE = os.getenv("JWT_AUDIENCE") or None
+
+# External OIDC provider (optional)
+# When JWT_JWKS_URL is set, tokens whose "iss" is JWT_JWKS_ISSUER are validated
+# locally against the provider's JWKS instead of calling an introspection
+# endpoint per request; tokens issued by this app keep using the local key.
+# The key set is cached in-process and re-fetched when an unknown "kid" shows up.
+JWT_JWKS_URL = os.getenv("JWT_JWKS_URL") or None
+JWT_JWKS_ISSUER = os.getenv("JWT_JWKS_ISSUER") or None
+JWT_JWKS_AUDIENCE = os.getenv("JWT_JWKS_AUDIENCE") or None
+JWT_JWKS_CACHE_TTL = int(os.getenv("JWT_JWKS_CACHE_TTL", "600"))
+JWT_JWKS_ALGORITHMS = [
+    alg.strip() for alg in os.getenv("JWT_JWKS_ALGORITHMS", "RS256").split(",") if alg.strip()
+]
+
+# Decoded-token cache
+# Verified claims are reused when the same token is decoded again, skipping
+# signature verification and JSON parsing. Entries never outlive the token's
+# own "exp". Set JWT_DECODE_CACHE_TTL=0 to disable.
+JWT_DECODE_CACHE = int(os.getenv("JWT_DECODE_CACHE", "8192"))
+JWT_DECODE_CACHE_TTL = int(os.getenv("JWT_DECODE_CACHE_TTL", "30"))
+
+
+def _load_keys(algorithm: str) -> Tuple[Any, Any]:
+    """Resolve the signing and verification keys for the configured algorithm.
+    
+    PEM keys are parsed once here so that encode/decode do not re-parse them
+    on every call; HMAC secrets are encoded to bytes once for the same reason.
+    
+    Returns:
+        Tuple of (signing key, verification key)
+    
+    Raises:
+        ValueError: If the keys required by the algorithm are not set
+    """
+    if algorithm.startswith("HS"):
+        if not JWT_SECRET_KEY:
+            raise ValueError(
+                "JWT_SECRET_KEY or SECRET_KEY environment variable is required. "
+                "Please set it in .env file or as an environment variable."
+            )
+        secret = JWT_SECRET_KEY.encode("utf-8")
+        return secret, secret
+    
+    if not JWT_PRIVATE_KEY or not JWT_PUBLIC_KEY:
+        raise ValueError(
+            f"JWT_PRIVATE_KEY and JWT_PUBLIC_KEY environment variables are required "
+            f"for JWT_ALGORITHM={algorithm}."
+        )
+    from cryptography.hazmat.primitives.serialization import (
+        load_pem_private_key,
+        load_pem_public_key,
+    )
+    private_key = load_pem_private_key(JWT_PRIVATE_KEY.replace("\\n", "\n").encode(), password=None)
+    public_key = load_pem_public_key(JWT_PUBLIC_KEY.replace("\\n", "\n").encode())
+    return private_key, public_key
+
+
+_SIGNING_KEY, _VERIFY_KEY = _load_keys(JWT_ALGORITHM)
+_TOKEN_HEADERS = {"kid": JWT_KEY_ID} if JWT_KEY_ID else None
+_ACCESS_TTL_SECONDS = JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60
+_REFRESH_TTL_SECONDS = JWT_REFRESH_TOKEN_EXPIRE_DAYS * 86400
+_REGISTERED_CLAIMS = {
+    claim: value
+    for claim, value in (("iss", JWT_ISSUER), ("aud", JWT_AUDIENCE))
+    if value
+}
+if JWT_JWKS_URL and not JWT_JWKS_ISSUER:
+    raise ValueError(
+        "JWT_JWKS_ISSUER is required when JWT_JWKS_URL is set; it tells "
+        "provider tokens apart from the ones this app issues."
+    )
+_jwks_client = (
+    jwt.PyJWKClient(JWT_JWKS_URL, cache_keys=True, lifespan=JWT_JWKS_CACHE_TTL)
+    if JWT_JWKS_URL
+    else None
+)
 
 
 def generate_access_token(user_id: int, username: str, role: str = 'user', additional_claims: Optional[Dict[str, Any]] = None) -> str:
@@ -32,20 +117,26 @@ def generate_access_token(user_id: int, username: str, role: str = 'user', addit
     Returns:
         Encoded JWT token string
     """
+    # One clock read; integer epoch seconds encode directly without datetime conversion
+    now = int(time.time())
     payload = {
         "user_id": user_id,
         "username": username,
         "role": role,
         "type": "access",
-        "iat": datetime.utcnow(),
-        "exp": datetime.utcnow() + timedelta(minutes=JWT_ACCESS_TOKEN_EXPIRE_MINUTES),
+        # Unique id so tokens minted in the same second never collide
+        "jti": uuid.uuid4().hex,
+        "iat": now,
+        "exp": now + _ACCESS_TTL_SECONDS,
     }
     
+    payload.update(_REGISTERED_CLAIMS)
     if additional_claims:
         payload.update(additional_claims)
     
-    token = jwt.encode(payload, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
-    logger.debug("Generated access token for user_id: %s, role: %s", user_id, role)
+    token = jwt.encode(payload, _SIGNING_KEY, algorithm=JWT_ALGORITHM, headers=_TOKEN_HEADERS)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Generated access token for user_id: %s, role: %s", user_id, role)
     return token
 
 
@@ -60,38 +151,129 @@ def generate_refresh_token(user_id: int, username: str, role: str = 'user') -> s
     Returns:
         Encoded JWT refresh token string
     """
+    now = int(time.time())
     payload = {
         "user_id": user_id,
         "username": username,
         "role": role,
         "type": "refresh",
-        "iat": datetime.utcnow(),
-        "exp": datetime.utcnow() + timedelta(days=JWT_REFRESH_TOKEN_EXPIRE_DAYS),
+        "jti": uuid.uuid4().hex,
+        "iat": now,
+        "exp": now + _REFRESH_TTL_SECONDS,
     }
+    payload.update(_REGISTERED_CLAIMS)
     
-    token = jwt.encode(payload, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
-    logger.debug("Generated refresh token for user_id: %s", user_id)
+    token = jwt.encode(payload, _SIGNING_KEY, algorithm=JWT_ALGORITHM, headers=_TOKEN_HEADERS)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Generated refresh token for user_id: %s", user_id)
     return token
 
 
-def decode_token(token: str) -> Optional[Dict[str, Any]]:
-    """Decode and validate a JWT token.
+# Maps token -> (claims, expires_at). Only successfully verified tokens are stored.
+_decode_cache: TTLCache = TTLCache(maxsize=max(JWT_DECODE_CACHE, 1), ttl=max(JWT_DECODE_CACHE_TTL, 1))
+_decode_cache_lock = threading.Lock()
+
+
+def is_provider_token(claims: Dict[str, Any]) -> bool:
+    """Tell whether (unverified) claims belong to the external OIDC provider.
     
     Args:
-        token: JWT token string
+        claims: Token payload, e.g. from peek_claims()
     
     Returns:
-        Decoded token payload if valid, None otherwise
+        True if JWKS validation is enabled and the token's issuer is the provider
     """
+    return _jwks_client is not None and claims.get("iss") == JWT_JWKS_ISSUER
+
+
+def _decode_uncached(token: str) -> Optional[Dict[str, Any]]:
+    # Only peek at the issuer when there is a provider to route to
+    claims = peek_claims(token) if _jwks_client is not None else None
     try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        return payload
+        if claims is not None and is_provider_token(claims):
+            key = _jwks_client.get_signing_key_from_jwt(token).key
+            algorithms = JWT_JWKS_ALGORITHMS
+            issuer, audience = JWT_JWKS_ISSUER, JWT_JWKS_AUDIENCE
+        else:
+            key = _VERIFY_KEY
+            algorithms = [JWT_ALGORITHM]
+            issuer, audience = JWT_ISSUER, JWT_AUDIENCE
+        return jwt.decode(
+            token,
+            key,
+            algorithms=algorithms,
+            issuer=issuer,
+            audience=audience,
+            options={"require": ["exp"]},
+        )
     except jwt.ExpiredSignatureError:
         logger.warning("Token has expired")
         return None
     except jwt.InvalidTokenError as e:
         logger.warning("Invalid token: %s", e)
         return None
+    except jwt.PyJWKClientError as e:
+        logger.warning("Failed to resolve signing key from JWKS: %s", e)
+        return None
+
+
+def decode_token(token: str) -> Optional[Dict[str, Any]]:
+    """Decode and validate a JWT token.
+    
+    Results for valid tokens are cached for up to JWT_DECODE_CACHE_TTL
+    seconds (never past the token's ``exp``); invalid tokens are not cached.
+    
+    Args:
+        token: JWT token string
+    
+    Returns:
+        Decoded token payload if valid, None otherwise
+    """
+    if JWT_DECODE_CACHE_TTL <= 0 or JWT_DECODE_CACHE <= 0:
+        return _decode_uncached(token)
+    
+    now = time.time()
+    with _decode_cache_lock:
+        entry = _decode_cache.get(token)
+    if entry is not None and entry[1] > now:
+        return entry[0]
+    
+    payload = _decode_uncached(token)
+    if payload:
+        expires_at = min(now + JWT_DECODE_CACHE_TTL, payload["exp"])
+        with _decode_cache_lock:
+            _decode_cache[token] = (payload, expires_at)
+    return payload
+
+
+def forget_token(token: str) -> None:
+    """Drop a token from the decoded-token cache (e.g. on logout)."""
+    with _decode_cache_lock:
+        _decode_cache.pop(token, None)
+
+
+def clear_decode_cache() -> None:
+    """Remove all entries from the decoded-token cache."""
+    with _decode_cache_lock:
+        _decode_cache.clear()
+
+
+def peek_claims(token: str) -> Optional[Dict[str, Any]]:
+    """Read a token's claims WITHOUT verifying its signature or expiry.
+    
+    Only for cheap pre-checks (e.g. deriving lookup keys); never trust the
+    result for authorization without a subsequent decode_token().
+    
+    Args:
+        token: JWT token string
+    
+    Returns:
+        Unverified token payload, or None if the token is malformed
+    """
+    try:
+        return jwt.decode(token, options={"verify_signature": False})
+    except jwt.InvalidTokenError:
+        return None
 
 
 def get_token_from_header(auth_header: Optional[str]) -> Optional[str]:
@@ -103,13 +285,9 @@ def get_token_from_header(auth_header: Optional[str]) -> Optional[str]:
     Returns:
         Token string if valid format, None otherwise
     """
-    if not auth_header:
+    # Compare the fixed-width scheme prefix and slice the rest; no split/tuple
+    if not auth_header or len(auth_header) < 8:
         return None
-    
-    try:
-        scheme, token = auth_header.split(" ", 1)
-        if scheme.lower() != "bearer":
-            return None
-        return token
-    except ValueError:
+    if auth_header[:7].lower() != "bearer ":
         return None
+    return auth_header[7:].strip() or None
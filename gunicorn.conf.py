@@ -0,0 +1,24 @@
+"""Gunicorn settings, picked up automatically from the working directory.
+
+The app is imported once in the arbiter (preload_app) and forked into the
+workers, so .env is parsed and create_connexion_app() runs a single time and
+the loaded code is shared copy-on-write across workers.
+"""
+
+preload_app = True
+
+
+def post_fork(server, worker):
+    """Drop database connections inherited from the arbiter.
+
+    The engine and its pool were created while preloading; a connection
+    shared between processes would interleave their traffic. close=False
+    leaves the parent's sockets alone and just gives this worker a fresh pool.
+    Redis pools reset themselves after a fork (see app.redis_pool).
+    """
+    from app import db
+    from wsgi import connexion_app
+
+    with connexion_app.app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
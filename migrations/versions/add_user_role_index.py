@@ -0,0 +1,25 @@
+"""Add index on user.role
+
+Revision ID: add_user_role_index
+Revises: add_role_to_user
+Create Date: 2026-10-14 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_role_index'
+down_revision = 'add_role_to_user'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # username and email are already indexed by their UNIQUE constraints
+    # (see 9709973b9429_add_user_table); only role needs a plain index
+    op.create_index('ix_user_role', 'user', ['role'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_user_role', table_name='user')
@@ -1,10 +1,25 @@
 """Shared pytest fixtures."""
-import pytest
+import os
 
-from app import db
-from app.connexion_app import create_connexion_app
-from app.models import User
-from app.services.auth_service import AuthService
+# Cheapest Argon2 parameters for the suite; must be set before app modules
+# read them at import. Production defaults are unaffected.
+os.environ.setdefault("ARGON2_TIME_COST", "1")
+os.environ.setdefault("ARGON2_MEMORY_COST", "1024")
+os.environ.setdefault("ARGON2_PARALLELISM", "1")
+
+import pytest  # noqa: E402
+import fakeredis  # noqa: E402
+
+from app import db, cache  # noqa: E402
+from app.connexion_app import create_connexion_app  # noqa: E402
+from app.models import User  # noqa: E402
+from app.services import auth_service  # noqa: E402
+from app.services.auth_service import AuthService, _token_fingerprint  # noqa: E402
+from app.utils.auth_decorator import clear_verify_cache  # noqa: E402
+from app.utils.jwt_utils import clear_decode_cache, generate_access_token  # noqa: E402
+
+# Hashed once per session; every test user shares the same password
+_TEST_USER_HASH = AuthService.hash_password("testpassword123")
 
 
 @pytest.fixture(scope="session")
@@ -27,9 +42,15 @@ def client(connexion_app):
     """Provide a Connexion test client with an isolated database."""
     app = connexion_app.app
 
+    # The schema is created once per session; emptying the tables is much
+    # cheaper than dropping and recreating them for every test
     with app.app_context():
-        db.drop_all()
-        db.create_all()
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+    cache.clear()
+    clear_verify_cache()
+    clear_decode_cache()
 
     test_client = connexion_app.test_client()
     test_client.application = app
@@ -43,19 +64,44 @@ def client(connexion_app):
 def test_user(client):
     """Create a test user for authentication tests."""
     with client.application.app_context():
-        # Clean up any existing test user first
-        existing = User.query.filter_by(username="testuser").first()
-        if existing:
-            db.session.delete(existing)
-            db.session.commit()
-        
-        # Create a user with password
-        password_hash = AuthService.hash_password("testpassword123")
-        user = User(username="testuser", email="test@example.com", password_hash=password_hash)
+        # Tables are emptied by the client fixture, so no cleanup is needed
+        user = User(username="testuser", email="test@example.com", password_hash=_TEST_USER_HASH)
         db.session.add(user)
         db.session.commit()
         yield user
-        
-        # Cleanup
-        db.session.delete(user)
-        db.session.commit()
+
+
+@pytest.fixture
+def register_session(fake_redis):
+    """Return a helper that stores an active login session for a token."""
+    def register(user_id, token):
+        fingerprint = _token_fingerprint(token)
+        fake_redis.setex(f"session:{user_id}:{fingerprint}", auth_service.SESSION_TTL, str(user_id))
+        fake_redis.sadd(f"user_sessions:{user_id}", fingerprint)
+    return register
+
+
+@pytest.fixture
+def access_token(test_user):
+    """Access token for test_user, minted once per test."""
+    return generate_access_token(test_user.id, test_user.username)
+
+
+@pytest.fixture(scope="session")
+def fake_redis():
+    """In-process Redis used as the session store for the whole test session."""
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _session_redis(fake_redis):
+    """Point the auth service's shared Redis client at the fake server."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(auth_service, "_redis_client", fake_redis)
+        yield
+
+
+@pytest.fixture(autouse=True)
+def _flush_redis(fake_redis):
+    """Start every test with an empty session store."""
+    fake_redis.flushall()
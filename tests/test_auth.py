@@ -1,27 +1,26 @@
 """Tests for authentication endpoints and services."""
+import asyncio
+import json
 import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
 import pytest
 import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
 from datetime import datetime, timedelta
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 from app import db
 from app.models import User
-from app.services.auth_service import AuthService
+from app.redis_pool import get_pool
+from app.services import auth_service
+from app.services.auth_service import AuthService, _token_fingerprint
+from app.utils import json_utils, jwt_utils
 from app.utils.jwt_utils import decode_token, generate_access_token
 
 
-
-@pytest.fixture
-def mock_redis():
-    """Mock Redis client for session storage."""
-    mock_redis_client = MagicMock()
-    mock_redis_client.setex = MagicMock()
-    mock_redis_client.keys = MagicMock(return_value=[])
-    mock_redis_client.delete = MagicMock()
-    mock_redis_client.exists = MagicMock(return_value=False)
-    return mock_redis_client
-
-
 class TestUserRegistration:
     """Test user registration functionality."""
 
@@ -42,38 +41,27 @@ class TestUserRegistration:
 
         # Verify user was created in database
         with client.application.app_context():
-            user = User.query.filter_by(username="newuser").first()
+            user = db.session.get(User, body["id"])
             assert user is not None
+            assert user.username == "newuser"
             assert user.email == "newuser@example.com"
             assert user.password_hash is not None
 
-    def test_register_user_missing_fields(self, client):
+    @pytest.mark.parametrize("payload", [
+        {"username": "user1", "email": "user1@example.com"},
+        {"email": "user2@example.com", "password": "password123"},
+        {"username": "user3", "password": "password123"},
+    ], ids=["no-password", "no-username", "no-email"])
+    def test_register_user_missing_fields(self, client, payload):
         """Test registration with missing required fields."""
-        # Missing password
-        response = client.post("/api/auth/register", json={
-            "username": "user1",
-            "email": "user1@example.com"
-        })
+        response = client.post("/api/auth/register", json=payload)
+
         # Connexion may return validation error or our custom error
         assert response.status_code == 400
         body = response.json()
         # Check for either Connexion format or our custom format
         error_msg = body.get("error", "") or body.get("detail", "") or str(body)
-        assert "required" in error_msg.lower() or "password" in error_msg.lower()
-
-        # Missing username
-        response = client.post("/api/auth/register", json={
-            "email": "user2@example.com",
-            "password": "password123"
-        })
-        assert response.status_code == 400
-
-        # Missing email
-        response = client.post("/api/auth/register", json={
-            "username": "user3",
-            "password": "password123"
-        })
-        assert response.status_code == 400
+        assert "required" in error_msg.lower()
 
     def test_register_user_short_password(self, client):
         """Test registration with password too short."""
@@ -120,11 +108,8 @@ class TestUserRegistration:
 class TestUserLogin:
     """Test user login functionality."""
 
-    @patch('app.services.auth_service.get_redis_client')
-    def test_login_success(self, mock_get_redis, client, test_user, mock_redis):
+    def test_login_success(self, client, test_user):
         """Test successful user login."""
-        mock_get_redis.return_value = mock_redis
-
         payload = {
             "username": test_user.username,
             "password": "testpassword123"
@@ -174,29 +159,22 @@ class TestUserLogin:
         assert response.status_code == 401
         assert "invalid" in response.json().get("error", "").lower()
 
-    def test_login_missing_fields(self, client):
+    @pytest.mark.parametrize("payload", [
+        {"username": "testuser"},
+        {"password": "password123"},
+        {},
+    ], ids=["no-password", "no-username", "empty"])
+    def test_login_missing_fields(self, client, payload):
         """Test login with missing fields."""
-        # Missing password
-        response = client.post("/api/auth/login", json={"username": "testuser"})
-        assert response.status_code == 400
-
-        # Missing username
-        response = client.post("/api/auth/login", json={"password": "password123"})
-        assert response.status_code == 400
-
-        # Empty body
-        response = client.post("/api/auth/login", json={})
+        response = client.post("/api/auth/login", json=payload)
         assert response.status_code == 400
 
 
 class TestTokenRefresh:
     """Test token refresh functionality."""
 
-    @patch('app.services.auth_service.get_redis_client')
-    def test_refresh_token_success(self, mock_get_redis, client, test_user, mock_redis):
+    def test_refresh_token_success(self, client, test_user):
         """Test successful token refresh."""
-        mock_get_redis.return_value = mock_redis
-
         # First login to get refresh token
         login_response = client.post("/api/auth/login", json={
             "username": test_user.username,
@@ -221,6 +199,24 @@ class TestTokenRefresh:
         assert decoded is not None
         assert decoded["user_id"] == test_user.id
 
+    def test_refresh_token_revoked_user(self, client, test_user, fake_redis):
+        """Test refresh is rejected once the user has been revoked."""
+        login_response = client.post("/api/auth/login", json={
+            "username": test_user.username,
+            "password": "testpassword123"
+        })
+        refresh_token = login_response.json()["refresh_token"]
+
+        AuthService.revoke_user(test_user.id)
+        assert fake_redis.sismember("revoked_users", str(test_user.id))
+        assert not fake_redis.exists(f"user_sessions:{test_user.id}")
+
+        response = client.post("/api/auth/refresh", json={
+            "refresh_token": refresh_token
+        })
+
+        assert response.status_code == 404
+
     def test_refresh_token_invalid(self, client):
         """Test refresh with invalid token."""
         response = client.post("/api/auth/refresh", json={
@@ -243,16 +239,8 @@ class TestTokenRefresh:
 class TestLogout:
     """Test user logout functionality."""
 
-    @patch('app.services.auth_service.get_redis_client')
-    def test_logout_success(self, mock_get_redis, client, test_user, mock_redis):
+    def test_logout_success(self, client, test_user, fake_redis):
         """Test successful logout."""
-        mock_get_redis.return_value = mock_redis
-        # Mock for login (session storage)
-        mock_redis.setex = MagicMock()
-        # Mock for logout (session lookup and deletion)
-        mock_redis.keys.return_value = [f"session:{test_user.id}:abc123"]
-        mock_redis.exists.return_value = False  # Not blacklisted
-
         # Login first
         login_response = client.post("/api/auth/login", json={
             "username": test_user.username,
@@ -261,15 +249,17 @@ class TestLogout:
         assert login_response.status_code == 200
         access_token = login_response.json()["access_token"]
 
-        # Update mock for logout - need to return session keys for verify_session
-        mock_redis.keys.return_value = [f"session:{test_user.id}:anyprefix"]
-
         # Logout
         headers = {"Authorization": f"Bearer {access_token}"}
-        response = client.post("/api/auth/logout", headers=headers)
+        with patch.object(fake_redis, "keys") as mock_keys, \
+                patch.object(fake_redis, "scan_iter") as mock_scan:
+            response = client.post("/api/auth/logout", headers=headers)
 
         assert response.status_code == 200
         assert "successfully" in response.json().get("message", "").lower()
+        # Sessions are found through the user_sessions index, never a keyspace walk
+        mock_keys.assert_not_called()
+        mock_scan.assert_not_called()
 
     def test_logout_without_token(self, client):
         """Test logout without authentication token."""
@@ -288,16 +278,8 @@ class TestLogout:
 class TestGetCurrentUser:
     """Test get current user information."""
 
-    @patch('app.services.auth_service.get_redis_client')
-    def test_get_current_user_success(self, mock_get_redis, client, test_user, mock_redis):
+    def test_get_current_user_success(self, client, test_user):
         """Test successfully getting current user info."""
-        mock_get_redis.return_value = mock_redis
-        # Mock for login
-        mock_redis.setex = MagicMock()
-        # Mock for session verification
-        mock_redis.keys.return_value = [f"session:{test_user.id}:anyprefix"]
-        mock_redis.exists.return_value = False  # Not blacklisted
-
         # Login first
         login_response = client.post("/api/auth/login", json={
             "username": test_user.username,
@@ -355,6 +337,71 @@ class TestAuthService:
         # Wrong password
         assert AuthService.verify_password("wrongpassword", hashed) is False
 
+    def test_verify_password_existing_hashes(self):
+        """Test hashes created before the passlib removal still verify."""
+        # Generated by passlib's bcrypt handler
+        legacy_hash = "$2b$04$Y3qTQNfp3umRMjocAcj4GuJgFTKtTIJ2QWOYI0YufwXHD2KtqAa76"
+
+        assert AuthService.verify_password("testpassword123", legacy_hash) is True
+        assert AuthService.verify_password("testpassword123", "not-a-hash") is False
+
+    def test_hash_password_uses_argon2id(self):
+        """Test new hashes are Argon2id and do not need rehashing."""
+        hashed = AuthService.hash_password("testpassword123")
+
+        assert hashed.startswith("$argon2id$")
+        assert AuthService.password_needs_rehash(hashed) is False
+
+    def test_production_argon2_defaults_unaffected(self):
+        """Test the suite's cheap Argon2 parameters come only from its environment."""
+        env = {k: v for k, v in os.environ.items() if not k.startswith("ARGON2_")}
+        code = (
+            "from app.services.auth_service import _password_hasher as h;"
+            "print(h.time_cost, h.memory_cost, h.parallelism)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            env=env, capture_output=True, text=True, check=True,
+        )
+
+        assert result.stdout.split() == ["2", "65536", "2"]
+
+    def test_legacy_bcrypt_hash_upgraded_on_login(self, client):
+        """Test a bcrypt hash is replaced with Argon2id after a successful login."""
+        legacy_hash = "$2b$04$Y3qTQNfp3umRMjocAcj4GuJgFTKtTIJ2QWOYI0YufwXHD2KtqAa76"
+        with client.application.app_context():
+            user = User(username="legacy", email="legacy@example.com", password_hash=legacy_hash)
+            db.session.add(user)
+            db.session.commit()
+
+            assert AuthService.authenticate_user("legacy", "testpassword123") is not None
+
+            stored = db.session.get(User, user.id).password_hash
+            assert stored.startswith("$argon2id$")
+            assert AuthService.verify_password("testpassword123", stored) is True
+
+    def test_hash_passwords_bulk(self):
+        """Test bulk hashing keeps input order."""
+        passwords = ["first-password", "second-password", "third-password"]
+
+        hashes = AuthService.hash_passwords(passwords)
+
+        assert len(hashes) == 3
+        for password, hashed in zip(passwords, hashes):
+            assert AuthService.verify_password(password, hashed) is True
+
+    def test_async_password_helpers(self):
+        """Test async hash/verify run off the event loop and agree with sync ones."""
+        async def roundtrip():
+            hashed = await AuthService.ahash_password("testpassword123")
+            return (
+                await AuthService.averify_password("testpassword123", hashed),
+                await AuthService.averify_password("wrongpassword", hashed),
+            )
+
+        assert asyncio.run(roundtrip()) == (True, False)
+
     def test_authenticate_user_success(self, client, test_user):
         """Test successful user authentication."""
         with client.application.app_context():
@@ -375,6 +422,14 @@ class TestAuthService:
             user = AuthService.authenticate_user("nonexistent", "password123")
             assert user is None
 
+    def test_authenticate_nonexistent_user_still_verifies_hash(self, client):
+        """Test unknown usernames cost an Argon2 check like wrong passwords do."""
+        with client.application.app_context():
+            with patch.object(AuthService, "verify_password", return_value=False) as mock_verify:
+                assert AuthService.authenticate_user("nonexistent", "password123") is None
+            mock_verify.assert_called_once()
+            assert mock_verify.call_args.args[1].startswith("$argon2id$")
+
 
 class TestJWTUtils:
     """Test JWT utility functions."""
@@ -393,6 +448,25 @@ class TestJWTUtils:
         assert decoded["username"] == username
         assert decoded["type"] == "access"
 
+    def test_decode_result_cached(self):
+        """Test repeat decodes of a token skip verification until evicted."""
+        token = generate_access_token(1, "testuser")
+        with patch.object(jwt_utils.jwt, "decode", wraps=jwt.decode) as mock_decode:
+            assert decode_token(token) == decode_token(token)
+            assert mock_decode.call_count == 1
+
+            jwt_utils.forget_token(token)
+            assert decode_token(token)["user_id"] == 1
+            assert mock_decode.call_count == 2
+
+    def test_tokens_have_unique_jti(self):
+        """Test tokens minted back to back for the same claims still differ."""
+        first = generate_access_token(1, "testuser")
+        second = generate_access_token(1, "testuser")
+
+        assert first != second
+        assert decode_token(first)["jti"] != decode_token(second)["jti"]
+
     def test_decode_invalid_token(self):
         """Test decoding invalid token."""
         decoded = decode_token("invalid.token.here")
@@ -408,109 +482,247 @@ class TestJWTUtils:
             "iat": datetime.utcnow() - timedelta(hours=1),
             "exp": datetime.utcnow() - timedelta(minutes=1),  # Expired 1 minute ago
         }
-        secret = os.getenv("JWT_SECRET_KEY", os.getenv("SECRET_KEY", "dev-secret"))
-        expired_token = jwt.encode(payload, secret, algorithm="HS256")
+
+        expired_token = jwt.encode(payload, jwt_utils._SIGNING_KEY, algorithm=jwt_utils.JWT_ALGORITHM)
 
         decoded = decode_token(expired_token)
         assert decoded is None
 
+    def test_eddsa_tokens(self):
+        """Test signing and verifying tokens with an Ed25519 key pair."""
+        private_key = Ed25519PrivateKey.generate()
+        private_pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode()
+        public_pem = private_key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        ).decode()
+
+        with patch.multiple(jwt_utils, JWT_PRIVATE_KEY=private_pem, JWT_PUBLIC_KEY=public_pem):
+            signing_key, verify_key = jwt_utils._load_keys("EdDSA")
+
+        with patch.multiple(
+            jwt_utils,
+            JWT_ALGORITHM="EdDSA",
+            _SIGNING_KEY=signing_key,
+            _VERIFY_KEY=verify_key,
+            _TOKEN_HEADERS={"kid": "test-key"},
+        ):
+            token = generate_access_token(1, "testuser")
+            assert jwt.get_unverified_header(token) == {"alg": "EdDSA", "kid": "test-key", "typ": "JWT"}
+            decoded = decode_token(token)
+            assert decoded is not None
+            assert decoded["user_id"] == 1
+
+    def test_decode_with_jwks(self, jwks_provider):
+        """Test validating provider tokens against a cached JWKS."""
+        token = jwks_provider.issue(sub="42")
+        assert decode_token(token)["sub"] == "42"
+
+        # Wrong audience is rejected locally
+        assert decode_token(jwks_provider.issue(aud="other-api")) is None
+
+    def test_jwks_keeps_local_key_for_own_tokens(self, jwks_provider, access_token):
+        """Test tokens issued by this app are not looked up in the provider JWKS."""
+        assert decode_token(access_token)["user_id"] is not None
+        # Signed with the provider's key but not claiming its issuer
+        assert decode_token(jwks_provider.issue(iss="https://other.example.com")) is None
+
+    def test_asymmetric_algorithm_requires_keys(self):
+        """Test that asymmetric algorithms fail fast without a key pair."""
+        with patch.multiple(jwt_utils, JWT_PRIVATE_KEY=None, JWT_PUBLIC_KEY=None):
+            with pytest.raises(ValueError):
+                jwt_utils._load_keys("EdDSA")
+
+
+JWKS_ISSUER = "https://issuer.example.com"
 
-class TestSessionManagement:
-    """Test session management with Redis."""
 
-    @patch('app.services.auth_service.get_redis_client')
-    def test_session_stored_on_login(self, mock_get_redis, client, test_user, mock_redis):
-        """Test that session is stored in Redis on login."""
-        mock_get_redis.return_value = mock_redis
+@pytest.fixture
+def jwks_provider():
+    """Enable JWKS validation against an in-memory Ed25519 provider key set."""
+    private_key = Ed25519PrivateKey.generate()
+    jwk = json.loads(jwt.algorithms.OKPAlgorithm.to_jwk(private_key.public_key()))
+    jwk["kid"] = "provider-key"
+    jwks_client = jwt.PyJWKClient("https://issuer.example.com/jwks")
+
+    def issue(**overrides):
+        claims = {
+            "sub": "42",
+            "iss": JWKS_ISSUER,
+            "aud": "flask-api",
+            "exp": datetime.utcnow() + timedelta(minutes=5),
+        }
+        claims.update(overrides)
+        return jwt.encode(claims, private_key, algorithm="EdDSA", headers={"kid": "provider-key"})
+
+    # Only the HTTP fetch is replaced; key lookup by kid runs for real
+    with patch.object(jwks_client, "fetch_data", return_value={"keys": [jwk]}), patch.multiple(
+        jwt_utils,
+        _jwks_client=jwks_client,
+        JWT_JWKS_ISSUER=JWKS_ISSUER,
+        JWT_JWKS_AUDIENCE="flask-api",
+        JWT_JWKS_ALGORITHMS=["EdDSA"],
+    ):
+        yield SimpleNamespace(issue=issue)
 
-        response = client.post("/api/auth/login", json={
+
+class TestJWKSProvider:
+    """Test protected routes with JWKS validation enabled."""
+
+    def test_own_tokens_still_work(self, client, test_user, jwks_provider):
+        """Test login, /auth/me and logout keep working for locally issued tokens."""
+        login_response = client.post("/api/auth/login", json={
             "username": test_user.username,
             "password": "testpassword123"
         })
+        assert login_response.status_code == 200
+        headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
 
+        response = client.get("/api/auth/me", headers=headers)
         assert response.status_code == 200
-        # Verify Redis setex was called
-        assert mock_redis.setex.called
+        assert response.json()["user_id"] == test_user.id
 
-    @patch('app.services.auth_service.get_redis_client')
-    def test_session_removed_on_logout(self, mock_get_redis, client, test_user, mock_redis):
-        """Test that session is removed from Redis on logout."""
-        mock_get_redis.return_value = mock_redis
-        session_key = f"session:{test_user.id}:abc123"
-        mock_redis.keys.return_value = [session_key]
+        assert client.post("/api/auth/logout", headers=headers).status_code == 200
+        assert client.get("/api/auth/me", headers=headers).status_code == 401
 
+    def test_provider_token_skips_session(self, client, jwks_provider, fake_redis):
+        """Test provider tokens authenticate without a local Redis session."""
+        headers = {"Authorization": f"Bearer {jwks_provider.issue()}"}
+
+        response = client.get("/api/auth/me", headers=headers)
+        assert response.status_code == 200
+        assert not fake_redis.keys("session:*")
+
+        # Logout blacklists the provider token
+        assert client.post("/api/auth/logout", headers=headers).status_code == 200
+        assert client.get("/api/auth/me", headers=headers).status_code == 401
+
+    def test_provider_token_wrong_audience_rejected(self, client, jwks_provider):
+        """Test provider tokens are still validated on protected routes."""
+        headers = {"Authorization": f"Bearer {jwks_provider.issue(aud='other-api')}"}
+
+        response = client.get("/api/auth/me", headers=headers)
+        assert response.status_code == 401
+
+
+class TestSessionManagement:
+    """Test session management with Redis."""
+
+    def test_session_stored_on_login(self, client, test_user, fake_redis):
+        """Test that session is stored in Redis on login."""
+        with patch.object(fake_redis, "pipeline", wraps=fake_redis.pipeline) as mock_pipeline:
+            response = client.post("/api/auth/login", json={
+                "username": test_user.username,
+                "password": "testpassword123"
+            })
+
+        assert response.status_code == 200
+        # All session writes are batched into one pipeline round-trip
+        mock_pipeline.assert_called_once_with(transaction=False)
+        fingerprint = _token_fingerprint(response.json()["access_token"])
+        assert fake_redis.get(f"session:{test_user.id}:{fingerprint}") == str(test_user.id)
+        assert fake_redis.ttl(f"session:{test_user.id}:{fingerprint}") > 0
+        assert fake_redis.ttl(f"session_data:{test_user.id}") > 0
+        assert fake_redis.smembers(f"user_sessions:{test_user.id}") == {fingerprint}
+        assert 0 < fake_redis.ttl(f"user_sessions:{test_user.id}") <= auth_service.SESSION_TTL
+        # Session data is stored as parseable JSON
+        session_data = json_utils.loads(fake_redis.get(f"session_data:{test_user.id}"))
+        assert session_data["username"] == test_user.username
+
+    def test_session_removed_on_logout(self, client, test_user, fake_redis):
+        """Test that session is removed from Redis on logout."""
         # Login
         login_response = client.post("/api/auth/login", json={
             "username": test_user.username,
             "password": "testpassword123"
         })
         access_token = login_response.json()["access_token"]
+        fingerprint = _token_fingerprint(access_token)
 
         # Logout
         headers = {"Authorization": f"Bearer {access_token}"}
         client.post("/api/auth/logout", headers=headers)
 
-        # Verify delete was called
-        assert mock_redis.delete.called
+        # Verify the user's sessions and index were deleted and the token blacklisted
+        assert not fake_redis.exists(
+            f"session:{test_user.id}:{fingerprint}",
+            f"user_sessions:{test_user.id}",
+            f"session_data:{test_user.id}",
+        )
+        assert fake_redis.exists(f"blacklist:{fingerprint}")
 
-    @patch('app.services.auth_service.get_redis_client')
-    def test_verify_session_with_redis(self, mock_get_redis, client, test_user, mock_redis):
+    def test_verify_session_with_redis(self, client, test_user, access_token, fake_redis, register_session):
         """Test session verification checks Redis."""
-        mock_get_redis.return_value = mock_redis
-        mock_redis.exists.return_value = False  # Token not blacklisted
-
-        # Generate token first
-        token = generate_access_token(test_user.id, test_user.username)
-        
-        # Mock Redis to return session keys matching the pattern
-        # verify_session uses pattern: session:{user_id}:*
-        session_key = f"session:{test_user.id}:anyprefix"
-        mock_redis.keys.return_value = [session_key]
-
-        # Verify session
+        # Store an active session for the token
+        register_session(test_user.id, access_token)
+
+        # Verify session; blacklist and session checks share one round-trip
         with client.application.app_context():
-            payload = AuthService.verify_session(token)
-            # Note: verify_session checks if any session exists for the user
-            # It doesn't need to match the exact token prefix, just that a session exists
+            with patch.object(fake_redis, "pipeline", wraps=fake_redis.pipeline) as mock_pipeline:
+                payload = AuthService.verify_session(access_token)
             assert payload is not None
             assert payload["user_id"] == test_user.id
+            mock_pipeline.assert_called_once_with(transaction=False)
 
-    @patch('app.services.auth_service.get_redis_client')
-    def test_verify_session_not_in_redis(self, mock_get_redis, client, test_user, mock_redis):
+    def test_verify_session_not_in_redis(self, client, test_user, access_token):
         """Test that session not in Redis is rejected."""
-        mock_get_redis.return_value = mock_redis
-        mock_redis.keys.return_value = []  # No sessions found
-
-        # Generate token
-        token = generate_access_token(test_user.id, test_user.username)
-
         # Verify session (should fail because not in Redis)
         with client.application.app_context():
-            payload = AuthService.verify_session(token)
+            payload = AuthService.verify_session(access_token)
             # Session not found in Redis, so verification should fail
             assert payload is None
 
-    @patch('app.services.auth_service.get_redis_client')
-    def test_blacklisted_token_rejected(self, mock_get_redis, client, test_user, mock_redis):
+    def test_expired_session_rejected(self, client, test_user, access_token, fake_redis, register_session):
+        """Test a token is rejected once its own session key has expired."""
+        register_session(test_user.id, access_token)
+        # Simulate the session TTL running out while the user index survives
+        fake_redis.delete(f"session:{test_user.id}:{_token_fingerprint(access_token)}")
+
+        with client.application.app_context():
+            assert AuthService.verify_session(access_token) is None
+
+    def test_blacklisted_token_rejected(self, client, test_user, access_token, fake_redis, register_session):
         """Test that blacklisted tokens are rejected."""
-        mock_get_redis.return_value = mock_redis
-        mock_redis.keys.return_value = [f"session:{test_user.id}:abc123"]
-
-        # Generate token
-        token = generate_access_token(test_user.id, test_user.username)
-        
-        # Mock exists to return True for blacklist check
-        # verify_session checks blacklist key: blacklist:{token_prefix}
-        token_prefix = token[:16]
-        blacklist_key = f"blacklist:{token_prefix}"
-        
-        def exists_side_effect(key):
-            return key == blacklist_key
-        
-        mock_redis.exists.side_effect = exists_side_effect
+        # Give the token an active session that has been blacklisted
+        register_session(test_user.id, access_token)
+        fake_redis.set(f"blacklist:{_token_fingerprint(access_token)}", "1")
 
         # Verify session (should fail because token is blacklisted)
         with client.application.app_context():
-            payload = AuthService.verify_session(token)
+            with patch('app.services.auth_service.decode_token') as mock_decode:
+                payload = AuthService.verify_session(access_token)
             assert payload is None
-
+            # Rejected before paying for signature verification
+            mock_decode.assert_not_called()
+
+    def test_redis_client_is_shared(self, monkeypatch):
+        """Test the session Redis client is created once, on the shared pool."""
+        # Undo the session-wide fakeredis so the lazy-init branch runs
+        monkeypatch.setattr(auth_service, "_redis_client", None)
+
+        with patch.object(auth_service, "get_client", wraps=auth_service.get_client) as mock_get_client:
+            client = auth_service.get_redis_client()
+            assert auth_service.get_redis_client() is client
+
+        mock_get_client.assert_called_once_with(auth_service._REDIS_SESSION_URL, decode_responses=True)
+        assert client.connection_pool is get_pool(auth_service._REDIS_SESSION_URL, decode_responses=True)
+
+    def test_session_redis_url(self):
+        """Test resolved settings are turned into a URL for the shared pool."""
+        settings = {"host": "redis", "port": 6380, "db": 2, "password": "p@ss/word"}
+        assert auth_service._settings_to_url(settings) == "redis://:p%40ss%2Fword@redis:6380/2"
+        settings["password"] = None
+        assert auth_service._settings_to_url(settings) == "redis://redis:6380/2"
+
+    def test_session_keys_unique_per_token(self, test_user):
+        """Test tokens for the same user get distinct session fingerprints."""
+        first = generate_access_token(test_user.id, test_user.username)
+        second = generate_access_token(test_user.id, test_user.username, "admin")
+
+        # Same header, so a fixed-length prefix would collide
+        assert first[:16] == second[:16]
+        assert _token_fingerprint(first) != _token_fingerprint(second)
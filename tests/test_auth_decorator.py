@@ -1,54 +1,53 @@
 """Tests for authentication decorators."""
 import pytest
-from flask import Flask, request
-from app.utils.auth_decorator import require_auth, optional_auth
-from app.utils.jwt_utils import generate_access_token
+from unittest.mock import patch
+from flask import request
+from app.utils.auth_decorator import require_auth, optional_auth, verify_token, invalidate_token
+from app.utils.jwt_utils import get_token_from_header
 
 
 @pytest.fixture
-def test_app(client):
-    """Get Flask app from client."""
-    return client.application
+def auth_request(connexion_app):
+    """Build request contexts on the shared app, optionally with a bearer token.
+    
+    Tests that need no database rows use this instead of the client fixture,
+    which empties every table first.
+    """
+    app = connexion_app.app
+
+    def make(token=None):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        return app.test_request_context(headers=headers)
+    return make
 
 
 class TestRequireAuthDecorator:
     """Test @require_auth decorator."""
 
-    def test_require_auth_with_valid_token(self, client, test_user):
+    def test_require_auth_with_valid_token(self, auth_request, test_user, access_token, register_session):
         """Test decorator with valid token."""
-        from unittest.mock import patch
-
-        # Generate token
-        token = generate_access_token(test_user.id, test_user.username)
-
-        # Mock Redis to return session
-        with patch('app.services.auth_service.get_redis_client') as mock_get_redis:
-            mock_redis = mock_get_redis.return_value
-            # Mock session exists for this user
-            mock_redis.keys.return_value = [f"session:{test_user.id}:anyprefix"]
-            mock_redis.exists.return_value = False
-
-            # Create a test endpoint
-            @require_auth
-            def protected_endpoint():
-                return {"user_id": request.current_user["user_id"]}
-
-            # Set up request context
-            with client.application.test_request_context(
-                headers={"Authorization": f"Bearer {token}"}
-            ):
-                response = protected_endpoint()
-                # Decorator should allow access, return dict
-                assert isinstance(response, dict)
-                assert response["user_id"] == test_user.id
-
-    def test_require_auth_without_token(self, client):
+        # Register the token as an active session for this user
+        register_session(test_user.id, access_token)
+
+        # Create a test endpoint
+        @require_auth
+        def protected_endpoint():
+            return {"user_id": request.current_user["user_id"]}
+
+        # Set up request context
+        with auth_request(access_token):
+            response = protected_endpoint()
+            # Decorator should allow access, return dict
+            assert isinstance(response, dict)
+            assert response["user_id"] == test_user.id
+
+    def test_require_auth_without_token(self, auth_request):
         """Test decorator without token."""
         @require_auth
         def protected_endpoint():
             return {"message": "success"}
 
-        with client.application.test_request_context():
+        with auth_request():
             response = protected_endpoint()
             # Decorator returns Flask Response object or tuple
             if isinstance(response, tuple):
@@ -58,59 +57,78 @@ class TestRequireAuthDecorator:
                 assert response.status_code == 401
                 assert "required" in response.get_json().get("error", "").lower()
 
-    def test_require_auth_with_invalid_token(self, client):
+    def test_require_auth_with_invalid_token(self, auth_request):
         """Test decorator with invalid token."""
-        from unittest.mock import patch
-        
         @require_auth
         def protected_endpoint():
             return {"message": "success"}
 
-        with patch('app.services.auth_service.get_redis_client') as mock_get_redis:
-            mock_redis = mock_get_redis.return_value
-            mock_redis.keys.return_value = []
-            mock_redis.exists.return_value = False
-            
-            with client.application.test_request_context(
-                headers={"Authorization": "Bearer invalid.token"}
-            ):
-                response = protected_endpoint()
-                if isinstance(response, tuple):
-                    assert response[1] == 401
-                else:
-                    assert response.status_code == 401
+        with auth_request("invalid.token"):
+            response = protected_endpoint()
+            if isinstance(response, tuple):
+                assert response[1] == 401
+            else:
+                assert response.status_code == 401
+
+
+class TestVerifyTokenCache:
+    """Test the verified-token cache behind the auth decorators."""
+
+    def test_valid_token_is_cached(self, client, test_user, access_token):
+        """Test that repeated verification of a valid token hits the cache."""
+        with patch('app.utils.auth_decorator.AuthService.verify_session') as mock_verify:
+            mock_verify.return_value = {"user_id": test_user.id, "type": "access"}
+
+            assert verify_token(access_token)["user_id"] == test_user.id
+            assert verify_token(access_token)["user_id"] == test_user.id
+            assert mock_verify.call_count == 1
+
+            # Invalidated tokens are verified again
+            invalidate_token(access_token)
+            verify_token(access_token)
+            assert mock_verify.call_count == 2
+
+    @pytest.mark.parametrize("knob", ["AUTH_VERIFY_CACHE_TTL", "AUTH_VERIFY_CACHE_MAX"])
+    def test_cache_disabled_by_zero(self, client, test_user, access_token, knob):
+        """Test either knob at 0 bypasses the cache instead of failing."""
+        with patch(f'app.utils.auth_decorator.{knob}', 0), \
+                patch('app.utils.auth_decorator.AuthService.verify_session') as mock_verify:
+            mock_verify.return_value = {"user_id": test_user.id, "type": "access"}
+
+            assert verify_token(access_token)["user_id"] == test_user.id
+            assert verify_token(access_token)["user_id"] == test_user.id
+            assert mock_verify.call_count == 2
+
+    def test_invalid_token_is_not_cached(self, client):
+        """Test that failed verifications are never cached."""
+        with patch('app.utils.auth_decorator.AuthService.verify_session') as mock_verify:
+            mock_verify.return_value = None
+
+            assert verify_token("invalid.token") is None
+            assert verify_token("invalid.token") is None
+            assert mock_verify.call_count == 2
 
 
 class TestOptionalAuthDecorator:
     """Test @optional_auth decorator."""
 
-    def test_optional_auth_with_valid_token(self, client, test_user):
+    def test_optional_auth_with_valid_token(self, auth_request, test_user, access_token, register_session):
         """Test decorator with valid token."""
-        from unittest.mock import patch
-
-        token = generate_access_token(test_user.id, test_user.username)
-
-        with patch('app.services.auth_service.get_redis_client') as mock_get_redis:
-            mock_redis = mock_get_redis.return_value
-            # Mock session exists for this user
-            mock_redis.keys.return_value = [f"session:{test_user.id}:anyprefix"]
-            mock_redis.exists.return_value = False
-
-            @optional_auth
-            def public_endpoint():
-                if hasattr(request, 'current_user') and request.current_user:
-                    return {"user_id": request.current_user["user_id"], "authenticated": True}
-                return {"authenticated": False}
-
-            with client.application.test_request_context(
-                headers={"Authorization": f"Bearer {token}"}
-            ):
-                response = public_endpoint()
-                assert isinstance(response, dict)
-                assert response["authenticated"] is True
-                assert response["user_id"] == test_user.id
-
-    def test_optional_auth_without_token(self, client):
+        register_session(test_user.id, access_token)
+
+        @optional_auth
+        def public_endpoint():
+            if hasattr(request, 'current_user') and request.current_user:
+                return {"user_id": request.current_user["user_id"], "authenticated": True}
+            return {"authenticated": False}
+
+        with auth_request(access_token):
+            response = public_endpoint()
+            assert isinstance(response, dict)
+            assert response["authenticated"] is True
+            assert response["user_id"] == test_user.id
+
+    def test_optional_auth_without_token(self, auth_request):
         """Test decorator without token."""
         @optional_auth
         def public_endpoint():
@@ -118,11 +136,11 @@ class TestOptionalAuthDecorator:
                 return {"authenticated": True}
             return {"authenticated": False}
 
-        with client.application.test_request_context():
+        with auth_request():
             response = public_endpoint()
             assert response["authenticated"] is False
 
-    def test_optional_auth_with_invalid_token(self, client):
+    def test_optional_auth_with_invalid_token(self, auth_request):
         """Test decorator with invalid token (should still work, just not authenticated)."""
         @optional_auth
         def public_endpoint():
@@ -130,9 +148,24 @@ class TestOptionalAuthDecorator:
                 return {"authenticated": True}
             return {"authenticated": False}
 
-        with client.application.test_request_context(
-            headers={"Authorization": "Bearer invalid.token"}
-        ):
+        with auth_request("invalid.token"):
             response = public_endpoint()
             assert response["authenticated"] is False
 
+
+class TestGetTokenFromHeader:
+    """Test Authorization header parsing."""
+
+    @pytest.mark.parametrize("header,expected", [
+        ("Bearer abc.def.ghi", "abc.def.ghi"),
+        ("bearer abc.def.ghi", "abc.def.ghi"),
+        ("Bearer  abc.def.ghi ", "abc.def.ghi"),
+        ("Bearer ", None),
+        ("Basic abc", None),
+        ("Bearerabc.def", None),
+        ("", None),
+        (None, None),
+    ])
+    def test_get_token_from_header(self, header, expected):
+        """Test only well-formed bearer headers yield a token."""
+        assert get_token_from_header(header) == expected
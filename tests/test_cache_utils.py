@@ -0,0 +1,47 @@
+"""Tests for caching helpers."""
+from unittest.mock import MagicMock, patch
+
+from app import cache
+from app.utils.cache_utils import singleflight
+
+
+class TestSingleflight:
+    """Test the singleflight cache helper."""
+
+    def test_miss_loads_once_and_caches(self, client):
+        """Test that a miss runs the loader once and caches its result."""
+        loader = MagicMock(return_value="payload")
+
+        with client.application.app_context():
+            assert singleflight(cache, "sf:miss", loader, timeout=60) == "payload"
+            assert singleflight(cache, "sf:miss", loader, timeout=60) == "payload"
+            assert cache.get("lock:sf:miss") is None
+
+        loader.assert_called_once()
+
+    def test_waiter_uses_winner_result(self, client):
+        """Test that a caller losing the lock waits for the cached value."""
+        loader = MagicMock(return_value="from-loader")
+
+        with client.application.app_context():
+            # Another worker holds the lock and fills the cache while we wait
+            cache.add("lock:sf:wait", 1, timeout=10)
+
+            def fill_cache(_delay):
+                cache.set("sf:wait", "from-winner")
+
+            with patch("app.utils.cache_utils.time.sleep", side_effect=fill_cache):
+                assert singleflight(cache, "sf:wait", loader) == "from-winner"
+
+        loader.assert_not_called()
+
+    def test_waiter_loads_after_lock_timeout(self, client):
+        """Test that a stuck lock holder does not block callers forever."""
+        loader = MagicMock(return_value="fallback")
+
+        with client.application.app_context():
+            cache.add("lock:sf:stuck", 1, timeout=10)
+            with patch("app.utils.cache_utils.time.sleep"):
+                assert singleflight(cache, "sf:stuck", loader, lock_timeout=0) == "fallback"
+
+        loader.assert_called_once()
@@ -0,0 +1,46 @@
+"""Tests for the Connexion application factory."""
+from unittest.mock import patch
+
+from a2wsgi import WSGIMiddleware
+from connexion import FlaskApp
+
+from app.connexion_app import WSGI_THREADS, _size_wsgi_pool
+
+
+def _wsgi_bridge(connexion_app):
+    return connexion_app._middleware_app.asgi_app  # pylint: disable=protected-access
+
+
+def test_built_app_thread_pool_has_wsgi_threads(connexion_app):
+    bridge = _wsgi_bridge(connexion_app)
+
+    assert isinstance(bridge, WSGIMiddleware)
+    assert bridge.executor._max_workers == WSGI_THREADS  # pylint: disable=protected-access
+
+
+def test_wsgi_thread_pool_sized():
+    cnx_app = FlaskApp(__name__)
+
+    _size_wsgi_pool(cnx_app, 3)
+
+    bridge = _wsgi_bridge(cnx_app)
+    assert bridge.executor._max_workers == 3  # pylint: disable=protected-access
+    assert bridge.app == cnx_app.app.wsgi_app
+
+
+def test_wsgi_thread_pool_at_least_one_thread():
+    cnx_app = FlaskApp(__name__)
+
+    _size_wsgi_pool(cnx_app, 0)
+
+    assert _wsgi_bridge(cnx_app).executor._max_workers == 1  # pylint: disable=protected-access
+
+
+@patch("app.connexion_app.version", return_value="3.1.0")
+def test_wsgi_thread_pool_untouched_on_other_connexion(_mock_version):
+    cnx_app = FlaskApp(__name__)
+    original = _wsgi_bridge(cnx_app)
+
+    _size_wsgi_pool(cnx_app, 3)
+
+    assert _wsgi_bridge(cnx_app) is original
@@ -6,4 +6,3 @@ def test_ping(client):
 
     assert response.status_code == 200
     assert response.json() == {"ok": True}
-
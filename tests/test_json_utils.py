@@ -0,0 +1,54 @@
+"""Tests for the JSON helpers and the orjson Flask provider."""
+import datetime
+import uuid
+from decimal import Decimal
+
+from app.utils.json_utils import OrjsonProvider, dumps, loads
+from app.utils.jwt_utils import generate_access_token
+
+
+class TestJsonUtils:
+    """Test the module-level helpers."""
+
+    def test_round_trip(self):
+        """Test loads() reverses dumps()."""
+        data = {"user_id": 1, "roles": ["user", "admin"], "active": True}
+        assert loads(dumps(data)) == data
+
+
+class TestOrjsonProvider:
+    """Test the provider installed as app.json."""
+
+    def test_installed_on_app(self, connexion_app):
+        """Test the app factory installs the provider."""
+        assert isinstance(connexion_app.app.json, OrjsonProvider)
+
+    def test_matches_connexion_defaults(self, connexion_app):
+        """Test extra types are encoded the way Connexion's encoder does."""
+        provider = connexion_app.app.json
+        value = uuid.UUID("650ff220-eb9b-47a7-8b9c-b4d07e822786")
+        body = provider.dumps({
+            "at": datetime.datetime(2024, 1, 2, 3, 4, 5),
+            "day": datetime.date(2024, 1, 2),
+            "id": value,
+            "price": Decimal("1.5"),
+            1: "non-str key",
+        }, indent=2)
+
+        assert provider.loads(body) == {
+            "at": "2024-01-02T03:04:05Z",
+            "day": "2024-01-02",
+            "id": str(value),
+            "price": 1.5,
+            "1": "non-str key",
+        }
+
+    def test_handler_response_is_compact(self, client, test_user, register_session):
+        """Test handler return values are encoded by the provider."""
+        token = generate_access_token(test_user.id, test_user.username, "admin")
+        register_session(test_user.id, token)
+
+        response = client.get("/api/users", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == 200
+        assert response.text.startswith('[{"id":')
@@ -0,0 +1,17 @@
+"""Tests for the package-level logging setup in app/__init__.py."""
+import logging
+import os
+import subprocess
+import sys
+
+
+def test_log_level_from_env():
+    env = {**os.environ, "LOG_LEVEL": "debug"}
+    code = "import logging, app; print(logging.getLogger('app').level)"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env, capture_output=True, text=True, check=True,
+    )
+
+    assert result.stdout.strip() == str(logging.DEBUG)
@@ -0,0 +1,19 @@
+"""Tests for shared Redis connection pools."""
+from app.redis_pool import get_client, get_pool
+
+
+class TestRedisPool:
+    """Test pool reuse by URL."""
+
+    def test_same_url_shares_pool(self):
+        """Test clients for the same URL share one pool."""
+        url = "redis://127.0.0.1:6379/5"
+        assert get_pool(url) is get_pool(url)
+        assert get_client(url).connection_pool is get_pool(url)
+
+    def test_different_settings_get_separate_pools(self):
+        """Test pools are keyed by URL and decode setting."""
+        assert get_pool("redis://127.0.0.1:6379/5") is not get_pool("redis://127.0.0.1:6379/6")
+        assert get_pool("redis://127.0.0.1:6379/5") is not get_pool(
+            "redis://127.0.0.1:6379/5", decode_responses=True
+        )
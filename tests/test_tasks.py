@@ -1,23 +1,29 @@
 """Tests for Celery task endpoints."""
+import threading
+import uuid
+
 import pytest
+from celery.exceptions import TimeoutError as CeleryTimeoutError
 from unittest.mock import patch, MagicMock
+from app.api.v1 import tasks as tasks_api
+from app.celery_app import celery
+from app.redis_pool import REDIS_MAX_CONNECTIONS
 from app.tasks import add
 
+TASK_ID = "650ff220-eb9b-47a7-8b9c-b4d07e822786"
+
 class TestTasks:
     """Test task endpoints."""
 
-    @patch('app.api.v1.tasks.add.delay')
-    def test_add_route(self, mock_delay, client):
-        """Test triggering the add task."""
-        mock_task = MagicMock()
-        mock_task.id = "test-task-id"
-        mock_delay.return_value = mock_task
-
-        response = client.get("/api/add/2/3")
+    def test_add_route(self, client):
+        """Test triggering the add task (runs eagerly under the testing config)."""
+        with patch('app.tasks.add.run', wraps=add.run) as mock_run:
+            response = client.get("/api/add/2/3")
 
         assert response.status_code == 200
-        assert response.json() == {"task_id": "test-task-id"}
-        mock_delay.assert_called_once_with(2, 3)
+        task_id = response.json()["task_id"]
+        assert uuid.UUID(task_id)
+        mock_run.assert_called_once_with(2, 3)
 
     @patch('app.api.v1.tasks.AsyncResult')
     def test_task_status_success(self, mock_async_result, client):
@@ -28,7 +34,7 @@ class TestTasks:
         mock_result.result = 5
         mock_async_result.return_value = mock_result
 
-        response = client.get("/api/task?task_id=test-id")
+        response = client.get(f"/api/task?task_id={TASK_ID}")
 
         assert response.status_code == 200
         body = response.json()
@@ -43,13 +49,28 @@ class TestTasks:
         mock_result.ready.return_value = False
         mock_async_result.return_value = mock_result
 
-        response = client.get("/api/task?task_id=test-id")
+        response = client.get(f"/api/task?task_id={TASK_ID}")
 
         assert response.status_code == 200
         body = response.json()
         assert body["state"] == "PENDING"
         assert "result" not in body
 
+    @patch('app.api.v1.tasks.AsyncResult')
+    def test_task_status_terminal_state_cached(self, mock_async_result, client):
+        """Test finished task state is served from cache on repeat polls."""
+        mock_result = MagicMock()
+        mock_result.state = "SUCCESS"
+        mock_result.ready.return_value = True
+        mock_result.result = 5
+        mock_async_result.return_value = mock_result
+
+        first = client.get(f"/api/task?task_id={TASK_ID}")
+        second = client.get(f"/api/task?task_id={TASK_ID}")
+
+        assert first.json() == second.json() == {"state": "SUCCESS", "result": 5}
+        mock_async_result.assert_called_once_with(TASK_ID)
+
     def test_task_status_missing_id(self, client):
         """Test task status endpoint without task_id."""
         response = client.get("/api/task")
@@ -59,26 +80,112 @@ class TestTasks:
         error_msg = body.get("detail", "") or body.get("error", "")
         assert "Missing" in error_msg and "task_id" in error_msg
 
+    @patch('app.api.v1.tasks.AsyncResult')
+    def test_task_status_invalid_id(self, mock_async_result, client):
+        """Test malformed task ids are rejected without a backend lookup."""
+        response = client.get("/api/task?task_id=not-a-uuid")
+
+        assert response.status_code == 400
+        assert response.json() == {"error": "Invalid parameter 'task_id'"}
+        mock_async_result.assert_not_called()
+
+    @patch('app.api.v1.tasks.AsyncResult')
+    def test_task_wait_ready(self, mock_async_result, client):
+        """Test long-poll returns the result once the task finishes."""
+        mock_result = MagicMock()
+        mock_result.state = "SUCCESS"
+        mock_result.get.return_value = 5
+        mock_async_result.return_value = mock_result
+
+        response = client.get(f"/api/task/wait?task_id={TASK_ID}&timeout=100")
+
+        assert response.status_code == 200
+        assert response.json() == {"state": "SUCCESS", "result": 5}
+        # Requested timeout is capped server-side
+        mock_result.get.assert_called_once_with(timeout=25.0, propagate=False)
+
+    @patch('app.api.v1.tasks._wait_slots', threading.BoundedSemaphore(1))
+    @patch('app.api.v1.tasks.AsyncResult')
+    def test_task_wait_at_capacity(self, mock_async_result, client):
+        """Test long-poll returns the current state without blocking when all slots are taken."""
+        mock_result = MagicMock()
+        mock_result.state = "PENDING"
+        mock_result.ready.return_value = False
+        mock_async_result.return_value = mock_result
+
+        assert tasks_api._wait_slots.acquire(blocking=False)
+        try:
+            response = client.get(f"/api/task/wait?task_id={TASK_ID}&timeout=20")
+        finally:
+            tasks_api._wait_slots.release()
+
+        assert response.status_code == 200
+        assert response.json() == {"state": "PENDING"}
+        mock_result.get.assert_not_called()
+
+    @patch('app.api.v1.tasks.AsyncResult')
+    def test_task_wait_failure(self, mock_async_result, client):
+        """Test long-poll reports a failed task's exception as an error message."""
+        mock_result = MagicMock()
+        mock_result.state = "FAILURE"
+        mock_result.get.return_value = ZeroDivisionError("division by zero")
+        mock_async_result.return_value = mock_result
+
+        response = client.get(f"/api/task/wait?task_id={TASK_ID}&timeout=1")
+
+        assert response.status_code == 200
+        assert response.json() == {"state": "FAILURE", "error": "division by zero"}
+
+    @patch('app.api.v1.tasks.AsyncResult')
+    def test_task_status_failure(self, mock_async_result, client):
+        """Test task status reports a failed task's exception as an error message."""
+        mock_result = MagicMock()
+        mock_result.state = "FAILURE"
+        mock_result.ready.return_value = True
+        mock_result.result = ZeroDivisionError("division by zero")
+        mock_async_result.return_value = mock_result
+
+        response = client.get(f"/api/task?task_id={TASK_ID}")
+
+        assert response.status_code == 200
+        assert response.json() == {"state": "FAILURE", "error": "division by zero"}
+
+    @patch('app.api.v1.tasks.AsyncResult')
+    def test_task_wait_timeout(self, mock_async_result, client):
+        """Test long-poll returns the current state on timeout."""
+        mock_result = MagicMock()
+        mock_result.state = "PENDING"
+        mock_result.get.side_effect = CeleryTimeoutError()
+        mock_async_result.return_value = mock_result
+
+        response = client.get(f"/api/task/wait?task_id={TASK_ID}&timeout=1")
+
+        assert response.status_code == 200
+        assert response.json() == {"state": "PENDING"}
+
 
 class TestCeleryTasks:
     """Test Celery task logic directly."""
 
-    def test_add_task(self):
+    @pytest.mark.parametrize("x,y,expected", [(2, 3, 5), (10, 20, 30), (-1, 1, 0)])
+    def test_add_task(self, x, y, expected):
         """Test the add task logic."""
-        # Directly calling the function (not the task wrapper) if possible,
-        # or calling the .run method if it's bound.
-        # Since 'add' is decorated, add.run or add(x, y) works in eager mode or unit test
-        # provided celery is configured for testing (task_always_eager).
-        
-        # For unit testing the logic inside the task:
-        res = add(2, 3)
-        assert res == 5
-
-    @patch('app.tasks.celery')
-    def test_add_task_with_app_context(self, mock_celery):
-        """Test task execution with app context check."""
-        mock_celery.app = MagicMock()
-        # We just want to ensure no error is raised and logic flows
-        res = add(10, 20)
-        assert res == 30
-
+        # Calling the task object runs it synchronously in this process
+        assert add(x, y) == expected
+
+    def test_add_task_with_app_context(self, connexion_app):
+        """Test task execution inside the Flask app context set by init_celery."""
+        # create_connexion_app() bound the real Flask app; no mock needed
+        assert celery.app is connexion_app.app
+        assert add(10, 20) == 30
+
+    def test_add_task_routed_to_fast_queue(self):
+        """Test add is routed to the fast queue and acks early."""
+        route = celery.amqp.router.route({}, add.name)
+        assert route["queue"].name == "fast"
+        assert add.acks_late is False
+
+    def test_redis_connection_limit_shared(self):
+        """Test the broker and result backend use the shared Redis connection limit."""
+        assert celery.conf.broker_transport_options["max_connections"] == REDIS_MAX_CONNECTIONS
+        assert celery.conf.redis_max_connections == REDIS_MAX_CONNECTIONS
@@ -2,6 +2,11 @@
 import pytest
 from unittest.mock import patch
 
+from app import db
+from app.models import User
+from app.services.user_service import UserService
+from app.utils.jwt_utils import generate_access_token
+
 class TestUserEndpoints:
     
     @patch('app.api.v1.users._load_user_from_source')
@@ -16,47 +21,52 @@ class TestUserEndpoints:
         
         # Verify mock called
         mock_load.assert_called_with("123")
+        assert response.headers["Cache-Control"] == "private, max-age=60"
+        etag = response.headers["ETag"]
+        
+        # Revalidation with the ETag returns an empty 304 from the cache
+        response = client.get("/api/user/123", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        mock_load.assert_called_once()
 
+    @pytest.mark.parametrize("role,status", [("user", 403), ("admin", 200)])
     @patch('app.services.user_service.UserService.get_all_users')
-    def test_list_users_admin_only(self, mock_get_all, client, test_user):
+    def test_list_users_admin_only(self, mock_get_all, client, test_user, register_session, role, status):
         """Test that list_users endpoint requires admin role."""
-        from app.utils.jwt_utils import generate_access_token
-        from unittest.mock import patch as mock_patch
+        # require_role checks the role claim, so no user row update is needed
+        token = generate_access_token(test_user.id, test_user.username, role)
+        register_session(test_user.id, token)
+        headers = {"Authorization": f"Bearer {token}"}
+        
+        mock_get_all.return_value = ([{"id": 1, "username": "test", "email": "test@example.com", "role": "admin"}], 200)
         
-        # Mock Redis for session verification
-        with mock_patch('app.services.auth_service.get_redis_client') as mock_get_redis:
-            mock_redis = mock_get_redis.return_value
-            mock_redis.keys.return_value = [f"session:{test_user.id}:anyprefix"]
-            mock_redis.exists.return_value = False
-            
-            # Test with regular user (should fail)
-            # First, update test_user to have 'user' role
-            with client.application.app_context():
-                from app import db
-                test_user.role = 'user'
-                db.session.commit()
-            
-            token = generate_access_token(test_user.id, test_user.username, 'user')
-            headers = {"Authorization": f"Bearer {token}"}
-            
-            response = client.get("/api/users", headers=headers)
-            assert response.status_code == 403
-            
-            # Test with admin user (should succeed)
-            with client.application.app_context():
-                test_user.role = 'admin'
-                db.session.commit()
-            
-            admin_token = generate_access_token(test_user.id, test_user.username, 'admin')
-            admin_headers = {"Authorization": f"Bearer {admin_token}"}
-            
-            mock_get_all.return_value = ([{"id": 1, "username": "test", "email": "test@example.com", "role": "admin"}], 200)
-            
-            response = client.get("/api/users", headers=admin_headers)
-            assert response.status_code == 200
-            mock_get_all.assert_called_once()
+        response = client.get("/api/users", headers=headers)
+        assert response.status_code == status
+        if status == 200:
+            mock_get_all.assert_called_once_with(limit=100, offset=0)
+        else:
+            mock_get_all.assert_not_called()
 
     def test_list_users_requires_auth(self, client):
         """Test that list_users endpoint requires authentication."""
         response = client.get("/api/users")
         assert response.status_code == 401
+
+    def test_get_all_users_paginated(self, client, test_user):
+        """Test get_all_users returns projected rows page by page."""
+        with client.application.app_context():
+            db.session.add(User(username="second", email="second@example.com", role="user"))
+            db.session.commit()
+
+            first_page, status = UserService.get_all_users(limit=1)
+            second_page, _ = UserService.get_all_users(limit=1, offset=1)
+
+        assert status == 200
+        assert first_page == [{
+            "id": test_user.id,
+            "username": test_user.username,
+            "email": test_user.email,
+            "role": test_user.role,
+        }]
+        assert second_page[0]["username"] == "second"
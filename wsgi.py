@@ -1,16 +1,31 @@
 """Entry point for running the Flask application with Connexion and Swagger UI.
 
-Development:
+Development (FLASK_ENV=development, the default):
     python wsgi.py
+    Runs a single uvicorn process with auto-reload. The event loop and HTTP
+    parser follow UVICORN_LOOP / UVICORN_HTTP (default "auto", which uses
+    uvloop and httptools when they are installed).
+
+Production (any other FLASK_ENV, used by the Docker image):
+    python wsgi.py
+    Replaces this process with gunicorn managing UvicornWorker processes.
+    gunicorn.conf.py preloads the app in the arbiter, so this module (and
+    .env) is loaded once and forked into the workers. Workers are sized from
+    the CPU count (see _gunicorn_workers):
+        WEB_CONCURRENCY   exact worker count, overrides everything else
+        WORKERS_PER_CORE  workers per CPU core, default 2 (2 * CPU + 1 workers)
+        MAX_WORKERS       upper bound on the computed worker count
 
 Production (using uvicorn):
-    uvicorn wsgi:app --host 0.0.0.0 --port 5000
+    uvicorn wsgi:app --host 0.0.0.0 --port 5000 --loop uvloop --http httptools
 
-Production (using gunicorn with uvicorn workers):
+Production (using gunicorn with uvicorn workers and a fixed worker count):
     gunicorn wsgi:app -w 4 -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:5000
+    UvicornWorker picks uvloop and httptools automatically when installed.
 
 Swagger UI is available at: http://localhost:5000/api/ui
 """
+import multiprocessing
 import os
 from dotenv import load_dotenv
 from app.connexion_app import create_connexion_app
@@ -19,15 +34,58 @@ from app.connexion_app import create_connexion_app
 # This will not override existing environment variables
 load_dotenv()
 
+env = os.getenv("FLASK_ENV", "development")
+
+
+def _gunicorn_workers() -> int:
+    """Compute the gunicorn worker count from the environment.
+
+    Uses the same knobs as the tiangolo/uvicorn-gunicorn image.
+
+    Returns:
+        Number of worker processes (at least 2 unless WEB_CONCURRENCY is set)
+    """
+    web_concurrency = os.getenv("WEB_CONCURRENCY")
+    if web_concurrency:
+        return int(web_concurrency)
+
+    workers_per_core = float(os.getenv("WORKERS_PER_CORE", "2"))
+    workers = max(int(workers_per_core * multiprocessing.cpu_count()) + 1, 2)
+    max_workers = os.getenv("MAX_WORKERS")
+    if max_workers:
+        workers = min(workers, int(max_workers))
+    return workers
+
+
+def _exec_gunicorn() -> None:
+    """Replace this process with gunicorn serving wsgi:app (never returns)."""
+    argv = [
+        "gunicorn", "wsgi:app",
+        "-k", "uvicorn.workers.UvicornWorker",
+        "-w", str(_gunicorn_workers()),
+        "--bind", "0.0.0.0:5000",
+    ]
+    # Heartbeat files on tmpfs avoid worker stalls on slow disk-backed /tmp
+    if os.path.isdir("/dev/shm"):
+        argv += ["--worker-tmp-dir", "/dev/shm"]
+    print(f"Starting gunicorn: {' '.join(argv)}", flush=True)
+    os.execvp("gunicorn", argv)
+
+
+# As a production launcher, hand over to gunicorn before building an app that
+# the exec would throw away; gunicorn imports this module again to serve it
+if __name__ == "__main__" and env != "development":
+    _exec_gunicorn()
+
 # Create the Connexion app instance
 # This will be used by both development and production
-env = os.getenv("FLASK_ENV", "development")
 connexion_app = create_connexion_app(env)
 
 # For WSGI/ASGI servers, expose the Connexion app itself
 # The middleware will handle routing
 app = connexion_app
 
+
 if __name__ == "__main__":
     # Development mode: use connexion_app.run() with import string for reload
     print("Starting Flask application with Connexion (Development Mode)")
@@ -37,5 +95,8 @@ if __name__ == "__main__":
         import_string="wsgi:app",
         host="0.0.0.0",
         port=5000,
-        reload=True
+        reload=True,
+        # "auto" picks uvloop/httptools when installed (uvloop is not on Windows)
+        loop=os.getenv("UVICORN_LOOP", "auto"),
+        http=os.getenv("UVICORN_HTTP", "auto"),
     )